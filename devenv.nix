@@ -16,8 +16,7 @@
 requests
 pydantic
 pydantic-settings
-markdown
-bs4'';
+markdown'';
   };
 
   git-hooks.hooks = {
@@ -0,0 +1,173 @@
+import asyncio
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from time import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class _Lookup(Future[Any]):
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        super().__init__()
+        self.loop = loop
+
+
+class AssetCache:
+    _shared: Dict[str, "AssetCache"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, max_size: int = 50000, ttl: int = 86400):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._inflight: Dict[str, _Lookup] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, domain: str, max_size: int = 50000, ttl: int = 86400) -> "AssetCache":
+        # Machine ids are only unique within a tenant, so clients share a cache per domain. The limits of the latest
+        # client of a domain apply to all of them
+        with cls._shared_lock:
+            cache = cls._shared.get(domain)
+            if cache is None:
+                cache = cls._shared[domain] = cls(max_size=max_size, ttl=ttl)
+            else:
+                cache.configure(max_size=max_size, ttl=ttl)
+            return cache
+
+    def configure(self, max_size: int, ttl: int):
+        with self._lock:
+            if (max_size, ttl) == (self.max_size, self.ttl):
+                return
+            self.max_size = max_size
+            self.ttl = ttl
+            while self.max_size and len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            return self.__lookup(str(key)) is not None
+
+    def __lookup(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if self.ttl and time() - entry[0] > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def __store(self, key: str, value: Any, fetched_at: Optional[float] = None):
+        self._entries[key] = (fetched_at if fetched_at is not None else time(), value)
+        self._entries.move_to_end(key)
+        while self.max_size and len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self.__lookup(str(key))
+            return default if entry is None else entry[1]
+
+    def put(self, key, value: Any):
+        with self._lock:
+            self.__store(str(key), value)
+
+    def __claim(self, key: str, loop: Optional[asyncio.AbstractEventLoop] = None):
+        with self._lock:
+            entry = self.__lookup(key)
+            if entry is not None:
+                self.hits += 1
+                return entry, None, False
+            future = self._inflight.get(key)
+            # A lookup abandoned by an event loop that was closed mid-request never completes, so it is taken over
+            if future is not None and future.loop is not None and future.loop.is_closed():
+                future = None
+            owner = future is None
+            if not owner:
+                self.coalesced += 1
+            else:
+                self.misses += 1
+                future = _Lookup(loop)
+                self._inflight[key] = future
+            return None, future, owner
+
+    def __release(self, key: str, future: _Lookup, value: Any = None, error: Optional[BaseException] = None):
+        with self._lock:
+            # Empty results are shared with waiting callers but not kept, so a failed lookup is retried later
+            if error is None and value:
+                self.__store(key, value)
+            if self._inflight.get(key) is future:
+                self._inflight.pop(key)
+        if isinstance(error, asyncio.CancelledError):
+            future.cancel()
+        elif error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(value)
+
+    def get_or_fetch(self, key, fetch: Callable[[], Any]):
+        key = str(key)
+        entry, future, owner = self.__claim(key)
+        if entry is not None:
+            return entry[1]
+        if not owner:
+            return future.result()
+        try:
+            value = fetch()
+        except BaseException as e:
+            self.__release(key, future, error=e)
+            raise
+        self.__release(key, future, value=value)
+        return value
+
+    async def get_or_fetch_async(self, key, fetch: Callable[[], Awaitable[Any]]):
+        key = str(key)
+        entry, future, owner = self.__claim(key, loop=asyncio.get_running_loop())
+        if entry is not None:
+            return entry[1]
+        if not owner:
+            # Shielded so a cancelled waiter does not cancel the lookup shared with the other waiters
+            return await asyncio.shield(asyncio.wrap_future(future))
+        try:
+            value = await fetch()
+        except BaseException as e:
+            self.__release(key, future, error=e)
+            raise
+        self.__release(key, future, value=value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses, "coalesced": self.coalesced, "evictions": self.evictions}
+
+    def load(self, filepath: str) -> int:
+        with open(filepath, "r") as cache_fh:
+            data = json.load(cache_fh)
+        now = time()
+        with self._lock:
+            for key, (fetched_at, value) in sorted(data.items(), key=lambda item: item[1][0]):
+                if self.ttl and now - fetched_at > self.ttl:
+                    continue
+                self.__store(key, value, fetched_at=fetched_at)
+            return len(self._entries)
+
+    def save(self, filepath: str):
+        with self._lock:
+            data = {key: [fetched_at, value] for key, (fetched_at, value) in self._entries.items()}
+        with open(filepath, "w") as cache_fh:
+            json.dump(data, cache_fh)
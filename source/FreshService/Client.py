@@ -1,409 +1,1135 @@
-from pydantic import Field
+from pydantic import Field, PrivateAttr
 from pydantic_settings import BaseSettings
-import markdown.htmlparser
-import markdown
-from requests import get, post, put, delete
 import json
-import sys
-from time import sleep
-from os.path import exists, isfile
-from FreshService.Config import Settings
-from typing import List, Dict
+import logging
+from time import perf_counter, sleep, time
+from datetime import datetime, timezone
+from os.path import exists, splitext
+from FreshService.Config import Settings, load_settings
+from FreshService.Session import FreshSession, AsyncFreshSession
+from FreshService.AssetCache import AssetCache
+from FreshService.RateLimiter import RateLimiter
+from FreshService.Storage import CacheBackend, JsonCacheBackend, ShardedJsonCacheBackend, SqliteCacheBackend
+from FreshService.SearchIndex import SearchIndex
+from FreshService.Records import RECORD_TYPES, InstallRecord, LicenseRecord, UserRecord, intern, software_from_dict
+from FreshService.Journal import ExpansionJournal
+from FreshService.HtmlText import HtmlTextConverter
+from FreshService.Metrics import Metrics, configure_logging
+from FreshService.Templates import TicketTemplates, read_message, render_markdown
+from FreshService.Report import REPORT_WRITERS, MarkdownReportWriter, ReportWriter, group_installs, install_in_use
+from typing import Any, Iterator, List, Dict, Optional, Set, TextIO, Tuple
+from contextlib import ExitStack
 import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import asyncio
 
-from bs4 import BeautifulSoup, MarkupResemblesLocatorWarning
-import warnings
-
-warnings.filterwarnings("ignore", category=MarkupResemblesLocatorWarning)
+logger = logging.getLogger(__name__)
 
 
 class FreshService(BaseSettings):
-    settings: Settings = Settings()
-    ENUM_CACHE: Dict = {"VENDOR": "./.freshservice_vendors.json",
-                        "SOFTWARE": "./.freshservice_software.json"}
-    FRESH_HEADER: Dict = {"Content-Type": "application/json"}
-    FRESH_TEMPLATES: Dict = {}   
-
-    VendorRegister: Dict = {}
-    SoftwareRegister: Dict = {}
-    
+    settings: Settings = Field(default_factory=load_settings)
+    ENUM_CACHE: Dict[str, str] = {"VENDOR": "./.freshservice_vendors.json",
+                                  "SOFTWARE": "./.freshservice_software.json",
+                                  "ASSET": "./.freshservice_assets.json"}
+    FRESH_HEADER: Dict[str, str] = {"Content-Type": "application/json"}
+    FRESH_TEMPLATES: Dict[str, Any] = {}   
+
+    VendorRegister: Dict[str, Any] = {}
+    SoftwareRegister: Dict[str, Any] = {}
+
+    _session: Optional[FreshSession] = PrivateAttr(default=None)
+    _session_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _rate_limiter: Optional[RateLimiter] = PrivateAttr(default=None)
+    _cache_backend: Optional[CacheBackend] = PrivateAttr(default=None)
+    _asset_cache: Optional[AssetCache] = PrivateAttr(default=None)
+    _vendor_index: SearchIndex = PrivateAttr(default_factory=SearchIndex)
+    _software_index: SearchIndex = PrivateAttr(default_factory=SearchIndex)
+    _templates: Optional[TicketTemplates] = PrivateAttr(default=None)
+    _metrics: Metrics = PrivateAttr(default_factory=Metrics)
+    _journal: Optional[ExpansionJournal] = PrivateAttr(default=None)
+    _loaded_vendors: Set[str] = PrivateAttr(default_factory=set)
+    _software_complete: bool = PrivateAttr(default=False)
+
+    def model_post_init(cls, __context):
+        configure_logging(verbose=cls.settings.VERBOSE, log_format=cls.settings.LOG_FORMAT)
+
+    @property
+    def session(cls) -> FreshSession:
+        if cls._session is None:
+            with cls._session_lock:
+                if cls._session is None:
+                    cls._session = FreshSession(pool_size=cls.settings.MAX_POOL_SIZE,
+                                                http2=cls.settings.HTTP2,
+                                                headers=cls.FRESH_HEADER,
+                                                auth=(cls.settings.FRESH_KEY, "X"))
+        return cls._session
+
+
+    @property
+    def rate_limiter(cls) -> RateLimiter:
+        if cls._rate_limiter is None:
+            with cls._session_lock:
+                if cls._rate_limiter is None:
+                    cls._rate_limiter = RateLimiter(rate_per_minute=cls.settings.RATE_LIMIT_PER_MINUTE)
+        return cls._rate_limiter
+
+
+    @property
+    def cache_backend(cls) -> CacheBackend:
+        if cls._cache_backend is None:
+            with cls._session_lock:
+                if cls._cache_backend is None:
+                    if cls.settings.CACHE_BACKEND == "sqlite":
+                        cls._cache_backend = SqliteCacheBackend(cls.settings.CACHE_DATABASE)
+                    elif cls.settings.CACHE_BACKEND == "json":
+                        cls._cache_backend = JsonCacheBackend(cls.ENUM_CACHE["VENDOR"], cls.ENUM_CACHE["SOFTWARE"])
+                    elif cls.settings.CACHE_BACKEND == "sharded":
+                        cls._cache_backend = ShardedJsonCacheBackend(cls.ENUM_CACHE["VENDOR"], splitext(cls.ENUM_CACHE["SOFTWARE"])[0])
+                    else:
+                        raise ValueError(f"Unknown cache backend: '{cls.settings.CACHE_BACKEND}'")
+        return cls._cache_backend
+
+
+    @property
+    def asset_cache(cls) -> AssetCache:
+        if cls._asset_cache is None:
+            with cls._session_lock:
+                if cls._asset_cache is None:
+                    cls._asset_cache = AssetCache.shared(cls.settings.FRESH_DOMAIN, max_size=cls.settings.ASSET_CACHE_SIZE,
+                                                         ttl=cls.settings.ASSET_CACHE_TTL)
+        return cls._asset_cache
+
+
+    @property
+    def html_converter(cls) -> HtmlTextConverter:
+        return HtmlTextConverter.shared(parser=cls.settings.ASSET_HTML_PARSER, max_size=cls.settings.ASSET_DESCRIPTION_CACHE_SIZE)
+
+
+    @property
+    def metrics(cls) -> Metrics:
+        return cls._metrics
+
+
+    @property
+    def templates(cls) -> TicketTemplates:
+        if cls._templates is None:
+            with cls._session_lock:
+                if cls._templates is None:
+                    cls._templates = cls.__load_templates()
+        return cls._templates
+
+
+    @property
+    def journal(cls) -> Optional[ExpansionJournal]:
+        if cls._journal is None and cls.settings.EXPANSION_JOURNAL:
+            with cls._session_lock:
+                if cls._journal is None:
+                    cls._journal = ExpansionJournal(cls.settings.EXPANSION_JOURNAL, max_age=cls.settings.EXPANSION_RESUME_WINDOW)
+        return cls._journal
+
+
+    def close(cls):
+        with cls._session_lock:
+            if cls._journal is not None:
+                cls._journal.close()
+            if cls._session is not None:
+                cls._session.close()
+                cls._session = None
+            if cls._cache_backend is not None:
+                cls._cache_backend.close()
+                cls._cache_backend = None
+
+
+    def __enter__(cls):
+        return cls
+
+
+    def __exit__(cls, *exc_info):
+        cls.close()
+
     def __load_templates(cls):
         with open(cls.settings.FRESH_TEMPLATE_FILEPATH) as templates_fh:
             cls.FRESH_TEMPLATES = json.load(templates_fh)
+        defaults = {"workspace_id": cls.settings.FRESH_WORKSPACE_ID,
+                    "email": cls.settings.FRESH_DEFAULT_CONTACT_EMAIL,
+                    "cc_emails": [*cls.FRESH_TEMPLATES.get("DEFAULT", {}).get("cc_emails", []), cls.settings.FRESH_DEFAULT_CONTACT_EMAIL],
+                    "department_id": cls.settings.FRESH_DEFAULT_DEPT_ID,
+                    "group_id": cls.settings.FRESH_DEFAULT_GROUP_ID,
+                    "category": cls.settings.FRESH_DEFAULT_CATEGORY,
+                    "subject": cls.settings.FRESH_DEFAULT_SUBJECT}
+        return TicketTemplates(cls.FRESH_TEMPLATES, defaults)
 
 
-    def __get_paginated_api(cls, url, extract_field):
-        page_number = 1
-        return_data = []
-        while page_number==1 or len(data[extract_field]) == 100:
-            if cls.settings.VERBOSE and (page_number%5)==0:
-                print(f"\tFetched {len(return_data)} {extract_field}")
-                sys.stdout.write(".")
-                sys.stdout.flush()
-            for i in range(1, cls.settings.MAX_REQUEST_RETRIES+1):
-                try:
-                    resp = get(f"{url}?per_page={cls.settings.FRESH_PAGE_SIZE}&page={page_number}",
-                            headers = cls.FRESH_HEADER, 
-                            auth = (cls.settings.FRESH_KEY, "X"), 
-                            timeout = cls.settings.MAX_REQUEST_TIMEOUT )
-                    if resp.status_code == 200:
-                        break
-                    elif resp.status_code == 404:
-                        break
-                    elif resp.status_code == 429:
-                        if cls.settings.VERBOSE:
-                            print("HTTP-429 - Waiting:", resp.headers["retry-after"])
-                        sleep_time = int(resp.headers["retry-after"])
-                        sleep(sleep_time)
-                    else:
-                        if cls.settings.VERBOSE:
-                            print(f"Failed to retrieve paginated API {i}/{cls.settings.MAX_REQUEST_RETRIES}: {resp.status_code} - {url}")
-                            print(resp.content)
-                        sleep(3)
-                except NameResolutionError:
-                    if cls.settings.VERBOSE:
-                        print(f"Failed to retrieve paginated API: {url}\n{e}")
-                    sleep(5)
+    def __api_url(cls, path:str):
+        return f"{cls.settings.FRESH_PROTOCOL}://{cls.settings.FRESH_DOMAIN}/api/v2/{path}"
 
-                except Exception as e:
-                    if cls.settings.VERBOSE:
-                        print(f"Failed to retrieve paginated API: {url}\n{e}")
-                    sleep(5)
-            if resp.status_code != 200:
-                if cls.settings.VERBOSE:
-                    print(f"API request was not found.  Request returned HTTP-{resp.status_code}")
-                    print(resp.url)
-                return return_data
-            else:
-                data = resp.json()
-                return_data.extend(data[extract_field])
-            page_number += 1
-        return return_data
 
+    def __response_sizes(cls, resp):
+        return int(resp.request.headers.get("Content-Length") or 0), len(resp.content)
 
-    def __get_api(cls, url, extract_field):
+
+    def __log_request_failure(cls, i:int, method:str, url:str, reason):
+        logger.debug("Request failed %d/%d: %s %s - %s", i, cls.settings.MAX_REQUEST_RETRIES, method, url, reason,
+                     extra={"event": "request_failed", "attempt": i, "method": method, "url": url})
+
+
+    def __log_throttled(cls, method:str, url:str, sleep_time:float):
+        logger.debug("HTTP-429 - Waiting: %s", sleep_time, extra={"event": "throttled", "method": method, "url": url, "wait": sleep_time})
+
+
+    def __request(cls, method:str, url:str, idempotent:bool=True, **kwargs):
+        kwargs.setdefault("timeout", cls.settings.MAX_REQUEST_TIMEOUT)
+        resp = None
         for i in range(1, cls.settings.MAX_REQUEST_RETRIES+1):
+            if i > 1:
+                cls.metrics.observe_retry(method, url)
+            wait = cls.rate_limiter.reserve()
+            sleep(wait)
+            while (paused_for := cls.rate_limiter.paused_for()) > 0:
+                wait += paused_for
+                sleep(paused_for)
+            cls.metrics.observe_wait(wait)
+            cls.metrics.before_request(method, url)
+            start = perf_counter()
             try:
-                resp = get(url, 
-                           headers=cls.FRESH_HEADER, 
-                           auth=(cls.settings.FRESH_KEY, "X"),
-                           timeout=cls.settings.MAX_REQUEST_TIMEOUT)
-                if resp.status_code == 200:
-                    return resp.json()[extract_field]
-                elif resp.status_code == 404:
+                resp = cls.session.request(method, url, **kwargs)
+            except Exception as e:
+                cls.metrics.observe_request(method, url, None, perf_counter() - start, error=e)
+                cls.__log_request_failure(i, method, url, e)
+                if not idempotent:
                     break
-                elif resp.status_code == 429:
-                    if cls.settings.VERBOSE:
-                        print("HTTP-429 - Waiting:", resp.headers["retry-after"])
-                    sleep_time = int(resp.headers["retry-after"])
-                    sleep(sleep_time)
-                else:
-                    sleep(3)
+                sleep(cls.rate_limiter.backoff(i))
+                continue
+            cls.metrics.observe_request(method, url, resp.status_code, perf_counter() - start, *cls.__response_sizes(resp))
+            cls.rate_limiter.update(resp.headers)
+            if resp.status_code == 429:
+                sleep_time = cls.rate_limiter.retry_after(resp.headers, i)
+                cls.__log_throttled(method, url, sleep_time)
+                cls.rate_limiter.pause(sleep_time)
+            elif resp.status_code >= 500 and idempotent:
+                cls.__log_request_failure(i, method, url, f"HTTP-{resp.status_code}")
+                sleep(cls.rate_limiter.backoff(i))
+            else:
+                break
+        return resp
+
+
+    async def __request_async(cls, session:AsyncFreshSession, method:str, url:str, **kwargs):
+        kwargs.setdefault("timeout", cls.settings.MAX_REQUEST_TIMEOUT)
+        resp = None
+        for i in range(1, cls.settings.MAX_REQUEST_RETRIES+1):
+            if i > 1:
+                cls.metrics.observe_retry(method, url)
+            wait = cls.rate_limiter.reserve()
+            await asyncio.sleep(wait)
+            while (paused_for := cls.rate_limiter.paused_for()) > 0:
+                wait += paused_for
+                await asyncio.sleep(paused_for)
+            cls.metrics.observe_wait(wait)
+            sent = []
+
+            def on_send():
+                cls.metrics.before_request(method, url)
+                sent.append(perf_counter())
+            try:
+                resp = await session.request(method, url, on_send=on_send, **kwargs)
             except Exception as e:
-                print(f"Failed to retrieve single API item {i}/{cls.settings.MAX_REQUEST_RETRIES}: {url}")
-                print(e)
-                sleep(5)
+                cls.metrics.observe_request(method, url, None, perf_counter() - sent[0] if sent else 0.0, error=e)
+                cls.__log_request_failure(i, method, url, e)
+                await asyncio.sleep(cls.rate_limiter.backoff(i))
+                continue
+            cls.metrics.observe_request(method, url, resp.status_code, perf_counter() - sent[0], *cls.__response_sizes(resp))
+            cls.rate_limiter.update(resp.headers)
+            if resp.status_code == 429:
+                sleep_time = cls.rate_limiter.retry_after(resp.headers, i)
+                cls.__log_throttled(method, url, sleep_time)
+                cls.rate_limiter.pause(sleep_time)
+            elif resp.status_code >= 500:
+                cls.__log_request_failure(i, method, url, f"HTTP-{resp.status_code}")
+                await asyncio.sleep(cls.rate_limiter.backoff(i))
+            else:
+                break
+        return resp
+
+
+    def __has_next_page(cls, resp, records:List[Any]):
+        # FreshService announces further pages in the Link header, a short page ends pagination when it is missing
+        if "link" in resp.headers:
+            return "next" in resp.links
+        return len(records) >= cls.settings.FRESH_PAGE_SIZE
+
+
+    def __page_failed(cls, url:str, page_number:int, resp, strict:bool):
+        status = resp.status_code if resp is not None else None
+        # Strict callers must not mistake a failed page for the end of the data
+        if strict:
+            raise RuntimeError(f"API request failed: {url} page {page_number} - HTTP-{status}")
+        logger.debug("API request failed: %s page %d - HTTP-%s", url, page_number, status,
+                     extra={"event": "page_failed", "url": url, "page": page_number})
+
+
+    def iter_paginated(cls, url:str, extract_field:str, params:Dict[str, Any]={}, strict:bool=False):
+        page_number = 1
+        fetched = 0
+        while True:
+            if (page_number%5)==0:
+                logger.debug("\tFetched %d %s", fetched, extract_field)
+            resp = cls.__request("GET", url, params={**params, "per_page": cls.settings.FRESH_PAGE_SIZE, "page": page_number})
+            if resp is None or resp.status_code != 200:
+                cls.__page_failed(url, page_number, resp, strict)
+                return
+            records = resp.json()[extract_field]
+            fetched += len(records)
+            yield from records
+            if not records or not cls.__has_next_page(resp, records):
+                return
+            page_number += 1
+
+
+    def __get_paginated_api(cls, url, extract_field, params:Dict[str, Any]={}, strict:bool=False):
+        return list(cls.iter_paginated(url, extract_field, params=params, strict=strict))
+
+
+    def __list_complete(cls, url, extract_field):
+        # Records missing from a listing are taken as deleted, so a listing cut short by a failed page aborts the refresh
+        try:
+            return cls.__get_paginated_api(url, extract_field, strict=True)
+        except RuntimeError as e:
+            logger.warning("Refresh aborted, %s", e, extra={"event": "refresh_aborted", "url": url})
+        return None
+
+
+    def __get_api(cls, url, extract_field):
+        resp = cls.__request("GET", url)
+        if resp is not None and resp.status_code == 200:
+            return resp.json()[extract_field]
+        logger.debug("Failed to retrieve single API item: %s - HTTP-%s", url, resp.status_code if resp is not None else None,
+                     extra={"event": "item_failed", "url": url})
+        return {}
+
+
+    async def aiter_paginated(cls, session:AsyncFreshSession, url:str, extract_field:str, params:Dict[str, Any]={}, strict:bool=False):
+        page_number = 1
+        while True:
+            resp = await cls.__request_async(session, "GET", url, params={**params, "per_page": cls.settings.FRESH_PAGE_SIZE, "page": page_number})
+            if resp is None or resp.status_code != 200:
+                cls.__page_failed(url, page_number, resp, strict)
+                return
+            records = resp.json()[extract_field]
+            for record in records:
+                yield record
+            if not records or not cls.__has_next_page(resp, records):
+                return
+            page_number += 1
+
+
+    async def __get_paginated_api_async(cls, session:AsyncFreshSession, url, extract_field, params:Dict[str, Any]={}, strict:bool=False):
+        return [record async for record in cls.aiter_paginated(session, url, extract_field, params=params, strict=strict)]
+
+
+    async def __get_api_async(cls, session:AsyncFreshSession, url, extract_field):
+        resp = await cls.__request_async(session, "GET", url)
+        if resp is not None and resp.status_code == 200:
+            return resp.json()[extract_field]
+        logger.debug("Failed to retrieve single API item: %s - HTTP-%s", url, resp.status_code if resp is not None else None,
+                     extra={"event": "item_failed", "url": url})
         return {}
 
 
     def __create_new_ticket(cls, ticket_object):
-        resp = post(f"https://{cls.settings.FRESH_DOMAIN}/api/v2/tickets", 
-                    headers=cls.FRESH_HEADER, 
-                    json=ticket_object,
-                    auth=(cls.settings.FRESH_KEY, "X"))
+        resp = cls.__request("POST", cls.__api_url("tickets"), idempotent=False, json=ticket_object)
+        if resp is None:
+            return None, "Request failed without a response"
         if resp.status_code != 201:
-            print(f"Ticket was not created.\nResponse code {resp.status_code},\nmessage: {resp.json()}")
-        else:
-            response = resp.json()
-            print(f"Ticket successfully created - {response['ticket']['id']} - {response['ticket']['subject']}")
-            
+            try:
+                message = resp.json()
+            except ValueError:
+                message = resp.text
+            return None, f"Response code {resp.status_code}, message: {message}"
+        return resp.json()["ticket"], None
+
 
-    
     def __delete_software(cls, software_id:str):
-        try:
-            resp = delete(f"https://{cls.settings.FRESH_DOMAIN}/api/v2/applications/{software_id}",
-                            headers=cls.FRESH_HEADER, auth=(cls.settings.FRESH_KEY, "X"), timeout=5)
-        except TimeoutError:
-            return False
-        if resp.status_code == 204:
+        resp = cls.__request("DELETE", cls.__api_url(f"applications/{software_id}"))
+        # An application that is already gone is as good as deleted
+        if resp is not None and resp.status_code in (204, 404):
             return True
+        logger.debug("Delete failed: %s - %s", software_id, "no response" if resp is None else f"HTTP-{resp.status_code}")
         return False
 
 
-    def wipe_software(cls):
-        deleted_softwares = []
-        for software_id in cls.SoftwareRegister:
-            count =  len(cls.SoftwareRegister[software_id]["users"])
-            count += len(cls.SoftwareRegister[software_id]["installs"])
-            count += len(cls.SoftwareRegister[software_id]["licenses"])
+    def __remove_software(cls, software_id:str):
+        software = cls.SoftwareRegister.pop(software_id)
+        cls._software_index.remove(software_id)
+        vendor = cls.VendorRegister.get(software.get("publisher_id"))
+        if vendor is not None and software_id in vendor.get("software", []):
+            vendor["software"].remove(software_id)
+        cls.cache_backend.delete_software(cls.SoftwareRegister, [software_id])
+
+
+    def wipe_software(cls, dry_run:bool=False):
+        summary: Dict[str, List[str]] = {"deleted": [], "would_delete": [], "skipped": [], "failed": []}
+        candidates = []
+        for software_id, software in cls.SoftwareRegister.items():
+            count = len(software["users"]) + len(software["installs"]) + len(software["licenses"])
             if count > 0:
-                state = False
-            else:
-                state = cls.__delete_software(software_id)
-            if state:
-                print(f"Successfully deleted: {software_id} - {cls.SoftwareRegister[software_id]['name']}")
-                deleted_softwares.append(software_id)
+                summary["skipped"].append(software_id)
+                logger.debug("Skipped: %s with %d relations", software_id, count)
+            elif not software.get("fetched_at"):
+                # Only a successful expansion sets fetched_at, without it empty relations may just never have been fetched
+                summary["skipped"].append(software_id)
+                logger.debug("Skipped: %s, not expanded", software_id)
             else:
-                print(f"Failed to deleted: {software_id} with {count} relations")
-        for software_id in deleted_softwares:
-            software = cls.SoftwareRegister.pop(software_id)
-        cls.__save_cache("SOFTWARE")
+                candidates.append(software_id)
+        if dry_run:
+            for software_id in candidates:
+                logger.info("Would delete: %s - %s", software_id, cls.SoftwareRegister[software_id]['name'])
+            summary["would_delete"] = candidates
+            return summary
 
+        with ThreadPoolExecutor(max_workers=cls.settings.MAX_WORKERS, thread_name_prefix="FreshService") as executor:
+            futures = {executor.submit(cls.__delete_software, software_id): software_id for software_id in candidates}
+            # Register and cache are only touched from this thread, one completion at a time
+            for future in as_completed(futures):
+                software_id = futures[future]
+                try:
+                    state = future.result()
+                except Exception as e:
+                    logger.warning("Failed to delete: %s\n%s", software_id, e)
+                    state = False
+                if state:
+                    logger.info("Successfully deleted: %s - %s", software_id, cls.SoftwareRegister[software_id]['name'],
+                                extra={"event": "software_deleted", "software_id": software_id})
+                    cls.__remove_software(software_id)
+                    summary["deleted"].append(software_id)
+                else:
+                    logger.warning("Failed to delete: %s", software_id, extra={"event": "delete_failed", "software_id": software_id})
+                    summary["failed"].append(software_id)
+        cls.cache_backend.flush(cls.SoftwareRegister)
+        logger.info("Deleted: %d - Skipped: %d - Failed: %d", len(summary['deleted']), len(summary['skipped']), len(summary['failed']))
+        return summary
 
-    def __load_cache(cls, CACHE_TYPE:str):
+
+    def __load_cache(cls, CACHE_TYPE:str, vendor_id_list:Optional[List[str]]=None):
         if CACHE_TYPE not in cls.ENUM_CACHE:
             raise KeyError(f"Key '{CACHE_TYPE}' does not exist")
-        print(f"Loading cache: {CACHE_TYPE}")
+        logger.info("Loading cache: %s", CACHE_TYPE)
         try:
-            with open(cls.ENUM_CACHE[CACHE_TYPE], "r") as cache_fh:
-                if CACHE_TYPE == "VENDOR":
-                    temp_data = json.load(cache_fh)
+            with cls.metrics.phase("cache_load", cache_type=CACHE_TYPE):
+                if CACHE_TYPE == "ASSET":
+                    return cls.asset_cache.load(cls.ENUM_CACHE[CACHE_TYPE])
+                elif CACHE_TYPE == "VENDOR":
+                    return cls.cache_backend.load_vendors()
                 elif CACHE_TYPE == "SOFTWARE":
-                    temp_data = json.load(cache_fh)
-                return temp_data
+                    register = cls.cache_backend.load_software(vendor_id_list=vendor_id_list)
+                    for software in register.values():
+                        software_from_dict(software)
+                    return register
         except Exception as e:
-            print(e)
+            logger.warning("Failed to load cache %s: %s", CACHE_TYPE, e, extra={"event": "cache_load_failed", "cache_type": CACHE_TYPE})
         return {}
 
 
     def __save_cache(cls, CACHE_TYPE):
         if CACHE_TYPE not in cls.ENUM_CACHE:
             raise KeyError(f"Key '{CACHE_TYPE}' does not exist")
-        print(f"Saving cache: {CACHE_TYPE}")
+        logger.info("Saving cache: %s", CACHE_TYPE)
         try:
-            with open(cls.ENUM_CACHE[CACHE_TYPE], "w") as cache_fh:
-                if CACHE_TYPE == "VENDOR":
-                    json.dump(cls.VendorRegister, cache_fh, indent=2)
+            with cls.metrics.phase("cache_save", cache_type=CACHE_TYPE):
+                if CACHE_TYPE == "ASSET":
+                    cls.asset_cache.save(cls.ENUM_CACHE[CACHE_TYPE])
+                elif CACHE_TYPE == "VENDOR":
+                    cls.cache_backend.save_vendors(cls.VendorRegister)
+                elif CACHE_TYPE == "SOFTWARE" and cls._software_complete:
+                    cls.cache_backend.save_software(cls.SoftwareRegister)
                 elif CACHE_TYPE == "SOFTWARE":
-                    json.dump(cls.SoftwareRegister, cache_fh, indent=2)
-                return True
+                    # Saving a partially loaded register as a whole would drop the vendors that were never loaded
+                    cls.cache_backend.upsert_software(cls.SoftwareRegister, list(cls.SoftwareRegister))
+                    cls.cache_backend.flush(cls.SoftwareRegister)
+            return True
+        except Exception as e:
+            logger.warning("Failed to save cache %s: %s", CACHE_TYPE, e, extra={"event": "cache_save_failed", "cache_type": CACHE_TYPE})
+        return False
+
+
+    def __software_cached(cls):
+        try:
+            return cls.cache_backend.has_software()
         except Exception as e:
-            print(e)
+            logger.warning("Failed to load cache %s: %s", "SOFTWARE", e, extra={"event": "cache_load_failed", "cache_type": "SOFTWARE"})
         return False
 
 
-    def get_vendors(cls, update_cache:bool=False):
-        print("Fetching: Vendors")
+    def __is_stale(cls, entry:Dict[str, Any], CACHE_TYPE:str):
+        max_staleness = cls.settings.CACHE_MAX_STALENESS.get(CACHE_TYPE)
+        if max_staleness is None:
+            return False
+        return time() - entry.get("fetched_at", 0) > max_staleness
+
+
+    def __vendor_entry(cls, vendor):
+        return {"name": vendor["name"], "software": [], "updated_at": vendor.get("updated_at"), "fetched_at": int(time())}
+
+
+    def __software_entry(cls, software):
+        return {"name": software["name"],
+                "publisher_id": "UNREGISTERED" if not software["publisher_id"] else str(software["publisher_id"]),
+                "category": software["category"],
+                "status": software["status"],
+                "updated_at": software.get("updated_at"),
+                "users": [],
+                "installs": [],
+                "licenses": []}
+
+
+    def get_vendors(cls, update_cache:bool=False, incremental:bool=False):
+        logger.info("Fetching: Vendors")
         if not update_cache:
             cls.VendorRegister = cls.__load_cache(CACHE_TYPE="VENDOR")
-        
+
         if update_cache or not cls.VendorRegister:
+            # The listing replaces the cache, so a failed page raises rather than dropping the vendors after it
+            vendor_list = cls.__get_paginated_api(cls.__api_url("vendors"), "vendors", strict=True)
             cls.VendorRegister.update({"UNREGISTERED": {"name": "UNREGISTERED", "software":[]}})
-            vendor_list = cls.__get_paginated_api(f"https://{cls.settings.FRESH_DOMAIN}/api/v2/vendors", "vendors")
             for vendor in vendor_list:
-                cls.VendorRegister.update({str(vendor["id"]): {"name": vendor["name"], "software":[]}})
+                cls.VendorRegister.update({str(vendor["id"]): cls.__vendor_entry(vendor)})
             cls.__save_cache("VENDOR")
+        elif incremental:
+            cls.refresh_vendors()
+        cls.__sync_index("VENDOR")
 
 
-    def get_software(cls, vendor_id_list:list[str]=[], software_filter:list[str]=[], update_cache:bool=False):
-        print("Fetching: Applications")
+    def refresh_vendors(cls):
+        vendors = {key: vendor for key, vendor in cls.VendorRegister.items() if key != "UNREGISTERED"}
+        if vendors and not any(cls.__is_stale(vendor, "VENDOR") for vendor in vendors.values()):
+            return []
+        logger.info("Refreshing: Vendors")
+        vendor_list = cls.__list_complete(cls.__api_url("vendors"), "vendors")
+        if not vendor_list:
+            return []
+        changed = []
+        seen = {"UNREGISTERED"}
+        for vendor in vendor_list:
+            vendor_id = str(vendor["id"])
+            seen.add(vendor_id)
+            cached = cls.VendorRegister.get(vendor_id)
+            if cached is None or cached["name"] != vendor["name"] or cached.get("updated_at") != vendor.get("updated_at"):
+                changed.append(vendor_id)
+            cls.VendorRegister[vendor_id] = {**cls.__vendor_entry(vendor), "software": cached["software"] if cached else []}
+        for vendor_id in set(cls.VendorRegister) - seen:
+            cls.VendorRegister.pop(vendor_id)
+            changed.append(vendor_id)
+        cls.VendorRegister.setdefault("UNREGISTERED", {"name": "UNREGISTERED", "software":[]})
+        logger.debug("Refreshed vendors: %d new, changed or deleted", len(changed))
+        cls.__sync_index("VENDOR")
+        cls.__save_cache("VENDOR")
+        return changed
+
+
+    def get_software(cls, vendor_id_list:list[str]=[], software_filter:list[str]=[], update_cache:bool=False, asset_lookup_mode:Optional[str]=None,
+                     incremental:bool=False):
+        logger.info("Fetching: Applications")
+        partial = None
         if not update_cache:
-            cls.SoftwareRegister = cls.__load_cache(CACHE_TYPE="SOFTWARE")
-            
-        if update_cache or not cls.SoftwareRegister:
-            software_list = cls.__get_paginated_api(f"https://{cls.settings.FRESH_DOMAIN}/api/v2/applications", "applications")
-            for software in software_list:
-                software["id"] = str(software["id"])
-                software["publisher_id"] = "UNREGISTERED" if not software["publisher_id"] else str(software["publisher_id"])
-                cls.SoftwareRegister.update({software["id"]:{
-                                            "name": software["name"],
-                                            "publisher_id": software["publisher_id"],
-                                            "category": software["category"], 
-                                            "status": software["status"],
-                                            "users": [],
-                                            "installs": [],
-                                            "licenses": []}
-                                        })
-            cls.expand_software(vendor_id_list=vendor_id_list, software_filter=software_filter)
+            partial = vendor_id_list if vendor_id_list and not incremental and cls.cache_backend.partial_reads else None
+            cls.SoftwareRegister = cls.__load_cache(CACHE_TYPE="SOFTWARE", vendor_id_list=partial)
+            cls._loaded_vendors = set(partial or [])
+            cls._software_complete = partial is None
+        # A partial load comes back empty for vendors without applications, only an empty cache means a full crawl
+        cache_empty = not cls.SoftwareRegister and (partial is None or not cls.__software_cached())
+
+        if incremental and cls.SoftwareRegister and not update_cache:
+            cls.refresh_software(vendor_id_list=vendor_id_list, software_filter=software_filter, asset_lookup_mode=asset_lookup_mode)
+        elif update_cache or cache_empty:
+            for software in cls.__get_paginated_api(cls.__api_url("applications"), "applications", strict=True):
+                cls.SoftwareRegister.update({str(software["id"]): cls.__software_entry(software)})
+            cls._software_complete = True
             cls.__save_cache("SOFTWARE")
+            cls.expand_software(vendor_id_list=vendor_id_list, software_filter=software_filter, asset_lookup_mode=asset_lookup_mode)
         elif vendor_id_list:
-            cls.expand_software(vendor_id_list=vendor_id_list, software_filter=software_filter)
+            cls.expand_software(vendor_id_list=vendor_id_list, software_filter=software_filter, asset_lookup_mode=asset_lookup_mode)
 
-        for software_id, software in cls.SoftwareRegister.items():
+        for vendor in cls.VendorRegister.values():
+            vendor["software"] = []
+        cls.__link_software(cls.SoftwareRegister)
+        cls.__sync_index("SOFTWARE")
+
+
+    def __link_software(cls, register:Dict[str, Any]):
+        for software_id, software in register.items():
             if software["publisher_id"] not in cls.VendorRegister:
                 software["publisher_id"] = "UNREGISTERED"
             cls.VendorRegister[software["publisher_id"]]["software"].append(software_id)
 
-    
+
+    def __ensure_vendors(cls):
+        if cls.VendorRegister:
+            return
+        cls.VendorRegister = cls.__load_cache(CACHE_TYPE="VENDOR")
+        cls.VendorRegister.setdefault("UNREGISTERED", {"name": "UNREGISTERED", "software":[]})
+        for vendor in cls.VendorRegister.values():
+            vendor["software"] = []
+        cls.__link_software(cls.SoftwareRegister)
+        cls.__sync_index("VENDOR")
+
+
+    def __ensure_software(cls, vendor_id_list:Optional[List[str]]=None):
+        # The software cache is read on first use, and only for the vendors asked for when the backend stores them separately
+        cls.__ensure_vendors()
+        if cls._software_complete:
+            return
+        if vendor_id_list and cls.cache_backend.partial_reads:
+            vendor_ids = [vendor_id for vendor_id in vendor_id_list if vendor_id not in cls._loaded_vendors]
+            if not vendor_ids:
+                return
+            register = cls.__load_cache(CACHE_TYPE="SOFTWARE", vendor_id_list=vendor_ids)
+            cls._loaded_vendors.update(vendor_ids)
+        else:
+            register = cls.__load_cache(CACHE_TYPE="SOFTWARE")
+            vendor_ids = list(cls.VendorRegister)
+            cls._software_complete = True
+        for software_id, software in register.items():
+            cls.SoftwareRegister.setdefault(software_id, software)
+        vendor_id_set = set(vendor_ids)
+        for vendor_id in vendor_id_set & cls.VendorRegister.keys():
+            cls.VendorRegister[vendor_id]["software"] = []
+        cls.__link_software({software_id: software for software_id, software in cls.SoftwareRegister.items()
+                             if software["publisher_id"] in vendor_id_set or software["publisher_id"] not in cls.VendorRegister})
+        cls.__sync_index("SOFTWARE")
+
+
+    def refresh_software(cls, vendor_id_list:list[str]=[], software_filter:list[str]=[], asset_lookup_mode:Optional[str]=None):
+        logger.info("Refreshing: Applications")
+        software_list = cls.__list_complete(cls.__api_url("applications"), "applications")
+        if not software_list:
+            return []
+        changed = []
+        updated_at = {}
+        seen = set()
+        for software in software_list:
+            software_id = str(software["id"])
+            seen.add(software_id)
+            cached = cls.SoftwareRegister.get(software_id)
+            entry = cls.__software_entry(software)
+            if cached is None:
+                cls.SoftwareRegister[software_id] = {**entry, "updated_at": None}
+                changed.append(software_id)
+                updated_at[software_id] = entry["updated_at"]
+                continue
+            modified = cached.get("updated_at") is None or cached["updated_at"] != entry["updated_at"]
+            cached.update({key: entry[key] for key in ("name", "publisher_id", "category", "status")})
+            if modified or cls.__is_stale(cached, "SOFTWARE"):
+                changed.append(software_id)
+                updated_at[software_id] = entry["updated_at"]
+        deleted = set(cls.SoftwareRegister) - seen
+        for software_id in deleted:
+            cls.SoftwareRegister.pop(software_id)
+        cls.cache_backend.delete_software(cls.SoftwareRegister, deleted)
+
+        software_ids = cls.__select_software(vendor_id_list=vendor_id_list, software_filter=software_filter, software_id_list=changed)
+        cls.__refresh_assets(kept=set(cls.SoftwareRegister) - set(software_ids))
+        # Only applications that are re-expanded take the new updated_at, the rest stay marked as changed
+        for software_id in software_ids:
+            cls.SoftwareRegister[software_id]["updated_at"] = updated_at.get(software_id)
+        logger.info("Refreshing %d of %d applications, %d deleted", len(software_ids), len(cls.SoftwareRegister), len(deleted))
+        if software_ids:
+            cls.expand_software(software_id_list=software_ids, asset_lookup_mode=asset_lookup_mode)
+        cls.cache_backend.flush(cls.SoftwareRegister)
+        return software_ids
+
+
+    def __assets_current_since(cls, software_ids:Set[str]):
+        # Installs took their asset details from the asset cache, which serves entries up to ASSET_CACHE_TTL old
+        registered = [cls.SoftwareRegister[software_id] for software_id in software_ids]
+        fetched_at = [software["fetched_at"] for software in registered if software["installs"] and software.get("fetched_at")]
+        if not fetched_at:
+            return None
+        if not cls.settings.ASSET_CACHE_TTL:
+            return 0
+        return max(0, min(fetched_at) - cls.settings.ASSET_CACHE_TTL)
+
+
+    def __refresh_assets(cls, kept:Set[str]):
+        since = cls.__assets_current_since(kept)
+        if since is None:
+            return 0
+        if not len(cls.asset_cache) and exists(cls.ENUM_CACHE["ASSET"]):
+            cls.__load_cache(CACHE_TYPE="ASSET")
+        params = {"include": "type_fields"}
+        if since:
+            updated_since = datetime.fromtimestamp(since, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+            params["filter"] = f"\"updated_at:>'{updated_since}'\""
+        # The window is derived from the register on every run, so an aborted listing is picked up again by the next refresh
+        try:
+            asset_list = cls.__get_paginated_api(cls.__api_url("assets"), "assets", params=params, strict=True)
+        except RuntimeError as e:
+            logger.warning("Asset refresh aborted, %s", e, extra={"event": "refresh_aborted", "url": cls.__api_url("assets")})
+            return 0
+        assets = {}
+        for asset_info in asset_list:
+            assets[asset_info["display_id"]] = cls.__asset_record(asset_info)
+            cls.asset_cache.put(asset_info["display_id"], assets[asset_info["display_id"]])
+        if not assets:
+            return 0
+        # Installs embed the asset details, so patch them in place rather than re-expanding the application
+        patched = []
+        for software_id, software in cls.SoftwareRegister.items():
+            for install in software["installs"]:
+                if install["machine"] in assets:
+                    install.update(assets[install["machine"]])
+                    patched.append(software_id)
+        cls.cache_backend.upsert_software(cls.SoftwareRegister, set(patched))
+        cls.__save_cache("ASSET")
+        logger.debug("Refreshed %d assets updated since %s", len(assets), params.get("filter", "ever"))
+        return len(assets)
+
+
     def __get_software_users(cls, software_id):
-        if cls.settings.VERBOSE:
-            print(f"Expanding application {software_id} w/users")
-        data = cls.__get_paginated_api(f"https://{cls.settings.FRESH_DOMAIN}/api/v2/applications/{software_id}/users/", "application_users")
-        cls.SoftwareRegister[software_id]["users"] = []
-        cls.SoftwareRegister[software_id]["users"] = [{"user": app["user_id"],
-                                            "license": app["license_id"],
-                                            "state": app["state"], 
-                                            "last_use": app["last_used"]} for app in data]
+        logger.debug("Expanding application %s w/users", software_id)
+        with cls.metrics.phase("expand_users", software_id=software_id):
+            data = cls.__get_paginated_api(cls.__api_url(f"applications/{software_id}/users/"), "application_users", strict=True)
+            return [cls.__user_record(app) for app in data]
 
 
     def __get_software_licenses(cls, software_id):
-        if cls.settings.VERBOSE:
-            print("Expanding applications w/licenses")
-        data = cls.__get_paginated_api(f"https://{cls.settings.FRESH_DOMAIN}/api/v2/applications/{software_id}/licenses", "licenses")
-        cls.SoftwareRegister[software_id]["licenses"] = []
-        cls.SoftwareRegister[software_id]["licenses"] = [{"license": app["id"], "contract_id": app["contract_id"]} for app in data]
+        logger.debug("Expanding application %s w/licenses", software_id)
+        with cls.metrics.phase("expand_licenses", software_id=software_id):
+            data = cls.__get_paginated_api(cls.__api_url(f"applications/{software_id}/licenses"), "licenses", strict=True)
+            return [cls.__license_record(app) for app in data]
 
 
     def __get_software_installs(cls, software_id):
-        if cls.settings.VERBOSE:
-            print("Expanding applications w/installations")
-        data = cls.__get_paginated_api(f"https://{cls.settings.FRESH_DOMAIN}/api/v2/applications/{software_id}/installations/", "installations")
-        cls.SoftwareRegister[software_id]["installs"] = []
-        for app in data:
-            asset_info = cls.__get_api(f"https://{cls.settings.FRESH_DOMAIN}/api/v2/assets/{app['installation_machine_id']}?include=type_fields", "asset")
-            lcl_description = None
-            if asset_info and "description" in asset_info and asset_info["description"]:
-                lcl_description = BeautifulSoup(asset_info["description"], "lxml").text.replace("\n", "  |  ").strip()
-            lcl_asset_info = None
-            if asset_info and "asset_state_11000765764" in asset_info["type_fields"]:
-                lcl_asset_info = asset_info["type_fields"]["asset_state_11000765764"]
-            cls.SoftwareRegister[software_id]["installs"].append({  "path": app["installation_path"],
-                                                                    "version": app["version"], 
-                                                                    "user": app["user_id"],
-                                                                    "name": asset_info["name"] if asset_info else None,
-                                                                    "description": lcl_description,
-                                                                    "status": lcl_asset_info,
-                                                                    "machine": app["installation_machine_id"]
-                                                                })
-
-
-    def __expand_software(cls, software_id):
-        cls.__get_software_users(software_id)
-        cls.__get_software_licenses(software_id)
-        cls.__get_software_installs(software_id)
+        logger.debug("Expanding application %s w/installations", software_id)
+        with cls.metrics.phase("expand_installs", software_id=software_id):
+            return [cls.__install_record(app, cls.__get_asset(app["installation_machine_id"]))
+                    for app in cls.iter_paginated(cls.__api_url(f"applications/{software_id}/installations/"), "installations", strict=True)]
+
+
+    def __user_record(cls, app):
+        return UserRecord(user=app["user_id"],
+                          license=app["license_id"],
+                          state=app["state"],
+                          last_use=app["last_used"])
+
+
+    def __license_record(cls, app):
+        return LicenseRecord(license=app["id"], contract_id=app["contract_id"])
+
+
+    def __install_record(cls, app, asset_info):
+        return InstallRecord(path=app["installation_path"],
+                             version=app["version"],
+                             user=app["user_id"],
+                             name=asset_info.get("name"),
+                             description=asset_info.get("description"),
+                             status=asset_info.get("status"),
+                             machine=app["installation_machine_id"])
+
+
+    def __fetch_asset(cls, machine_id):
+        asset_info = cls.__get_api(cls.__api_url(f"assets/{machine_id}?include=type_fields"), "asset")
+        if not asset_info:
+            return {}
+        return cls.__asset_record(asset_info)
+
+
+    def __asset_record(cls, asset_info):
+        lcl_description = None
+        if "description" in asset_info and asset_info["description"]:
+            with cls.metrics.phase("html_parse"):
+                lcl_description = cls.html_converter.convert(asset_info["description"])
+        lcl_asset_info = None
+        if "asset_state_11000765764" in asset_info.get("type_fields", {}):
+            lcl_asset_info = asset_info["type_fields"]["asset_state_11000765764"]
+        return {"name": intern(asset_info["name"]), "description": intern(lcl_description), "status": intern(lcl_asset_info)}
+
+
+    def __get_asset(cls, machine_id):
+        return cls.asset_cache.get_or_fetch(machine_id, lambda: cls.__fetch_asset(machine_id))
+
+
+    async def __fetch_asset_async(cls, session:AsyncFreshSession, machine_id):
+        asset_info = await cls.__get_api_async(session, cls.__api_url(f"assets/{machine_id}?include=type_fields"), "asset")
+        if not asset_info:
+            return {}
+        return cls.__asset_record(asset_info)
+
+
+    async def __get_asset_async(cls, session:AsyncFreshSession, machine_id):
+        return await cls.asset_cache.get_or_fetch_async(machine_id, lambda: cls.__fetch_asset_async(session, machine_id))
+
+
+    def prefetch_assets(cls):
+        logger.info("Prefetching: Assets")
+        count = 0
+        with cls.metrics.phase("asset_prefetch"):
+            for asset_info in cls.iter_paginated(cls.__api_url("assets"), "assets", params={"include": "type_fields"}):
+                cls.asset_cache.put(asset_info["display_id"], cls.__asset_record(asset_info))
+                count += 1
+        logger.debug("Prefetched %d assets", count)
+        return count
+
+
+    def __estimate_asset_lookups(cls, software_ids:List[str]):
+        machines: Set[str] = set()
+        unexpanded = 0
+        for software_id in software_ids:
+            installs = cls.SoftwareRegister[software_id]["installs"]
+            if not installs:
+                unexpanded += 1
+            machines.update(install["machine"] for install in installs)
+        return unexpanded + sum(1 for machine in machines if machine not in cls.asset_cache)
+
+
+    def __use_asset_prefetch(cls, software_ids:List[str], asset_lookup_mode:Optional[str]=None):
+        asset_lookup_mode = (asset_lookup_mode or cls.settings.ASSET_LOOKUP_MODE).lower()
+        if asset_lookup_mode not in ("auto", "prefetch", "single"):
+            raise ValueError(f"Unknown asset lookup mode: '{asset_lookup_mode}'")
+        if asset_lookup_mode != "auto":
+            return asset_lookup_mode == "prefetch"
+        estimate = cls.__estimate_asset_lookups(software_ids)
+        logger.debug("Estimated %d asset lookups for %d applications", estimate, len(software_ids))
+        return estimate >= cls.settings.ASSET_PREFETCH_THRESHOLD
+
+
+    def __finish_expansion(cls, software_id, errors:Optional[Dict[str, str]]=None, fields:Optional[Dict[str, Any]]=None):
+        failed = bool(errors)
+        if fields:
+            cls.SoftwareRegister[software_id].update(fields)
+        if not failed:
+            cls.SoftwareRegister[software_id]["fetched_at"] = int(time())
+            cls.cache_backend.upsert_software(cls.SoftwareRegister, [software_id])
+        if cls.journal is not None:
+            if errors:
+                cls.journal.failed(software_id, errors)
+            else:
+                cls.journal.completed(software_id, cls.SoftwareRegister[software_id])
         users = len(cls.SoftwareRegister[software_id]['users'])
         installs = len(cls.SoftwareRegister[software_id]['installs'])
         licenses = len(cls.SoftwareRegister[software_id]['licenses'])
-        print(f"Finished expanding: {software_id} {cls.SoftwareRegister[software_id]['name']} - {users}, {installs}, {licenses}")
+        logger.info("Finished expanding: %s %s - %d, %d, %d", software_id, cls.SoftwareRegister[software_id]['name'], users, installs, licenses,
+                    extra={"event": "software_expanded", "software_id": software_id, "users": users, "installs": installs, "licenses": licenses,
+                           "failed": failed})
+
+
+    async def __get_software_users_async(cls, session:AsyncFreshSession, software_id):
+        with cls.metrics.phase("expand_users", software_id=software_id):
+            data = await cls.__get_paginated_api_async(session, cls.__api_url(f"applications/{software_id}/users/"), "application_users", strict=True)
+            return [cls.__user_record(app) for app in data]
+
+
+    async def __get_software_licenses_async(cls, session:AsyncFreshSession, software_id):
+        with cls.metrics.phase("expand_licenses", software_id=software_id):
+            data = await cls.__get_paginated_api_async(session, cls.__api_url(f"applications/{software_id}/licenses"), "licenses", strict=True)
+            return [cls.__license_record(app) for app in data]
+
+
+    async def __get_software_installs_async(cls, session:AsyncFreshSession, software_id):
+        data = []
+        lookups = []
+        with cls.metrics.phase("expand_installs", software_id=software_id):
+            # Asset lookups start while the remaining installation pages are still being fetched
+            async for app in cls.aiter_paginated(session, cls.__api_url(f"applications/{software_id}/installations/"), "installations", strict=True):
+                data.append(app)
+                lookups.append(asyncio.ensure_future(cls.__get_asset_async(session, app["installation_machine_id"])))
+            assets = await asyncio.gather(*lookups)
+            return [cls.__install_record(app, asset_info) for app, asset_info in zip(data, assets)]
+
+
+    async def __expand_software_async(cls, session:AsyncFreshSession, writer:ThreadPoolExecutor, software_id):
+        results = await asyncio.gather(cls.__get_software_users_async(session, software_id),
+                                       cls.__get_software_licenses_async(session, software_id),
+                                       cls.__get_software_installs_async(session, software_id),
+                                       return_exceptions=True)
+        for result in results:
+            # gather also returns cancellation and interrupts, which must abort the run rather than count as a failed field
+            if isinstance(result, BaseException) and not isinstance(result, Exception):
+                raise result
+        errors = {}
+        fields = {}
+        for field, result in zip(("users", "licenses", "installs"), results):
+            if isinstance(result, Exception):
+                logger.warning("Failed expanding %s of %s: %s", field, software_id, result,
+                               extra={"event": "expansion_failed", "software_id": software_id, "field": field})
+                errors[field] = str(result)
+            else:
+                fields[field] = result
+        # The register, cache and journal are only written by the writer thread, so a cache flush never sees a half applied update
+        await asyncio.get_running_loop().run_in_executor(writer, cls.__finish_expansion, software_id, errors, fields)
+        return software_id if errors else None
 
 
-    def expand_software(cls, vendor_id_list:list = [], software_filter:list = []):
-        print("Expanding software")
-        threads = []
+    async def __run_expansion_async(cls, session:AsyncFreshSession, writer:ThreadPoolExecutor, software_ids:List[str]):
+        results = await asyncio.gather(*[cls.__expand_software_async(session, writer, software_id) for software_id in software_ids])
+        return {software_id for software_id in results if software_id is not None}
+
+
+    async def expand_software_async(cls, vendor_id_list:List[str] = [], software_filter:List[str] = [], asset_lookup_mode:Optional[str]=None,
+                                    software_id_list:Optional[List[str]] = None):
+        logger.info("Expanding software")
+        if not len(cls.asset_cache) and exists(cls.ENUM_CACHE["ASSET"]):
+            cls.__load_cache(CACHE_TYPE="ASSET")
+        software_ids = cls.__select_software(vendor_id_list=vendor_id_list, software_filter=software_filter, software_id_list=software_id_list)
+        async with AsyncFreshSession(cls.session, concurrency=cls.settings.MAX_CONCURRENCY) as session:
+            if software_ids and cls.__use_asset_prefetch(software_ids, asset_lookup_mode=asset_lookup_mode):
+                logger.info("Prefetching: Assets")
+                with cls.metrics.phase("asset_prefetch"):
+                    async for asset_info in cls.aiter_paginated(session, cls.__api_url("assets"), "assets",
+                                                                params={"include": "type_fields"}):
+                        cls.asset_cache.put(asset_info["display_id"], cls.__asset_record(asset_info))
+            with cls.metrics.phase("expansion", applications=len(software_ids)), \
+                    ThreadPoolExecutor(max_workers=1, thread_name_prefix="FreshServiceWriter") as writer:
+                failed = await cls.__run_expansion_async(session, writer, cls.__resume_expansion(software_ids))
+                for attempt in range(cls.settings.EXPANSION_RETRIES):
+                    if not failed:
+                        break
+                    cls.__log_retry(failed, attempt)
+                    failed = await cls.__run_expansion_async(session, writer, sorted(failed))
+        logger.debug("Asset cache: %s", cls.asset_cache.stats(), extra={"event": "asset_cache"})
+        logger.debug("Description cache: %s", cls.html_converter.stats(), extra={"event": "description_cache"})
+        cls.__save_cache("ASSET")
+        cls.__complete_expansion(software_ids, failed)
+        return software_ids
+
+
+    def __select_software(cls, vendor_id_list:List[str] = [], software_filter:List[str] = [], software_id_list:Optional[List[str]] = None):
+        software_ids = []
         for software_id, software in cls.SoftwareRegister.items():
+            if software_id_list is not None and software_id not in software_id_list:
+                continue
             if vendor_id_list and software["publisher_id"] not in vendor_id_list:
                 continue
-            if software_filter:
-                for filter in software_filter:
-                    if filter in software["name"]:
-                        thread = threading.Thread(target=cls.__expand_software, args=(software_id,))
-                        threads.append(thread)
-                        break
-            else:
-                thread = threading.Thread(target=cls.__expand_software, args=(software_id,))
-                threads.append(thread)
-        started_threads = []
-        for thread in threads:
-            while threading.active_count() >= 5:
-                sleep(1)
-            thread.start()
-            started_threads.append(thread)
-        for thread in threads:
-            thread.join()
-        cls.__save_cache("SOFTWARE")
-
-
-    def list_software(cls, vendor_id_list:List[str]=[], software_id_list:List[str]=[], write:bool=False, show_usage:bool=False):
-        string_builder = []
+            if software_filter and not any(filter in software["name"] for filter in software_filter):
+                continue
+            software_ids.append(software_id)
+        return software_ids
+
+
+    def expand_software(cls, vendor_id_list:List[str] = [], software_filter:List[str] = [], asset_lookup_mode:Optional[str]=None,
+                        software_id_list:Optional[List[str]] = None):
+        if cls.settings.ASYNC_EXPANSION:
+            return asyncio.run(cls.expand_software_async(vendor_id_list=vendor_id_list, software_filter=software_filter,
+                                                         asset_lookup_mode=asset_lookup_mode, software_id_list=software_id_list))
+        logger.info("Expanding software")
+        if not len(cls.asset_cache) and exists(cls.ENUM_CACHE["ASSET"]):
+            cls.__load_cache(CACHE_TYPE="ASSET")
+        software_ids = cls.__select_software(vendor_id_list=vendor_id_list, software_filter=software_filter, software_id_list=software_id_list)
+        if software_ids and cls.__use_asset_prefetch(software_ids, asset_lookup_mode=asset_lookup_mode):
+            cls.prefetch_assets()
+        with cls.metrics.phase("expansion", applications=len(software_ids)):
+            failed = cls.__run_expansion(cls.__resume_expansion(software_ids))
+            for attempt in range(cls.settings.EXPANSION_RETRIES):
+                if not failed:
+                    break
+                cls.__log_retry(failed, attempt)
+                failed = cls.__run_expansion(sorted(failed))
+        logger.debug("Asset cache: %s", cls.asset_cache.stats(), extra={"event": "asset_cache"})
+        logger.debug("Description cache: %s", cls.html_converter.stats(), extra={"event": "description_cache"})
+        cls.__save_cache("ASSET")
+        cls.__complete_expansion(software_ids, failed)
+        return software_ids
+
+
+    def __resume_expansion(cls, software_ids:List[str]):
+        if cls.journal is None:
+            return software_ids
+        checkpoints = cls.journal.load()
+        resumed = [software_id for software_id in software_ids if software_id in checkpoints]
+        if not resumed:
+            return software_ids
+        for software_id in resumed:
+            checkpoint = checkpoints[software_id]
+            software = cls.SoftwareRegister[software_id]
+            software.update({field: checkpoint[field] for field in RECORD_TYPES})
+            software["fetched_at"] = int(checkpoint["at"])
+            software_from_dict(software)
+        cls.cache_backend.upsert_software(cls.SoftwareRegister, resumed)
+        logger.info("Resuming expansion: %d of %d applications restored from %s", len(resumed), len(software_ids), cls.journal.filepath,
+                    extra={"event": "expansion_resumed", "resumed": len(resumed), "applications": len(software_ids)})
+        return [software_id for software_id in software_ids if software_id not in checkpoints]
+
+
+    def __log_retry(cls, failed:Set[str], attempt:int):
+        logger.info("Retrying expansion of %d failed applications (%d/%d)", len(failed), attempt + 1, cls.settings.EXPANSION_RETRIES,
+                    extra={"event": "expansion_retry", "software_ids": sorted(failed), "attempt": attempt + 1})
+
+
+    def __complete_expansion(cls, software_ids:List[str], failed:Set[str]):
+        cls.cache_backend.flush(cls.SoftwareRegister)
+        # The checkpoints are only dropped once the cache holds everything they recorded
+        if cls.journal is not None:
+            cls.journal.clear(software_ids)
+        if failed:
+            logger.warning("Failed expanding %d applications: %s", len(failed), ", ".join(sorted(failed)),
+                           extra={"event": "expansion_incomplete", "software_ids": sorted(failed)})
+
+
+    def __run_expansion(cls, software_ids:List[str]):
+        # Installs are queued first as they are usually the slowest sub-resource of an application
+        fetchers = {"installs": cls.__get_software_installs,
+                    "users": cls.__get_software_users,
+                    "licenses": cls.__get_software_licenses}
+        pending = {software_id: set(fetchers) for software_id in software_ids}
+        errors: Dict[str, Dict[str, str]] = {}
+        with ThreadPoolExecutor(max_workers=cls.settings.MAX_WORKERS, thread_name_prefix="FreshService") as executor:
+            futures = {executor.submit(fetcher, software_id): (software_id, field)
+                       for software_id in software_ids for field, fetcher in fetchers.items()}
+            try:
+                for future in as_completed(futures):
+                    software_id, field = futures[future]
+                    try:
+                        cls.SoftwareRegister[software_id][field] = future.result()
+                    except Exception as e:
+                        logger.warning("Failed expanding %s of %s: %s", field, software_id, e,
+                                       extra={"event": "expansion_failed", "software_id": software_id, "field": field})
+                        errors.setdefault(software_id, {})[field] = str(e)
+                    pending[software_id].discard(field)
+                    if not pending[software_id]:
+                        cls.__finish_expansion(software_id, errors=errors.get(software_id))
+            except BaseException:
+                # Finished applications are already journaled, queued work is dropped rather than awaited on interrupt
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+        return set(errors)
+
+
+    def __report_groups(cls, vendor_id_list:List[str]=[], software_id_list:List[str]=[]) -> Iterator[Tuple[str, str, Dict[str, Any], List[Any]]]:
         if software_id_list and not vendor_id_list:
             for software_id in software_id_list:
-                pid = cls.SoftwareRegister[software_id]['publisher_id']
-                pname = cls.VendorRegister[cls.SoftwareRegister[software_id]['publisher_id']]['name']
-                print(f"{pid} - {pname} - {software_id} - {cls.SoftwareRegister[software_id]['name']}")
-                string_builder.append(f"- {pid} - {pname} - {software_id} - {cls.SoftwareRegister[software_id]['name']}")
-        
-        else:
-            if not vendor_id_list:
-                vendor_id_list = cls.VendorRegister.keys()
-            for vendor_id in vendor_id_list:
-                temp_string_builder = []
-                vendor = cls.VendorRegister[vendor_id]
-                if not vendor['software'] and not cls.settings.VERBOSE:
+                software = cls.SoftwareRegister[software_id]
+                yield "summary", software["publisher_id"], cls.VendorRegister[software["publisher_id"]], [(software_id, software, None)]
+            return
+
+        software_id_set = set(software_id_list)
+        for vendor_id in vendor_id_list or list(cls.VendorRegister):
+            vendor = cls.VendorRegister[vendor_id]
+            if not vendor['software'] and not cls.settings.VERBOSE:
+                continue
+            software_list = []
+            for software_id in vendor['software']:
+                if software_id_set and software_id not in software_id_set:
                     continue
-                print(f"{vendor_id} - {vendor['name']}")
-                temp_string_builder.append(f"## {vendor_id} - {vendor['name']}\n")
-                for software_id in vendor['software']:
-                    if software_id_list and software_id not in software_id_list:
-                        continue
-                    software = cls.SoftwareRegister[software_id]
-                        
-                    if not cls.settings.VERBOSE and not software["users"] and not software["installs"] and not software["licenses"]:
-                        continue
+                software = cls.SoftwareRegister[software_id]
+                if not cls.settings.VERBOSE and not software["users"] and not software["installs"] and not software["licenses"]:
+                    continue
+                software_list.append((software_id, software, group_installs(software["installs"])))
+            yield "vendor", vendor_id, vendor, software_list
+
 
-                    print(f"\t{software_id} - {software['name']}")
-                    CONTENT_0 = False
-                    if software["installs"]:
-                        for version in set([install["version"] for install in software["installs"]]):
-                            print(f"\t\t{software['name']} v{version}")
-                            CONTENT_1 = False
-                            for install in software["installs"]:
-                                if install["version"] != version:
-                                    continue
-                                if not cls.settings.VERBOSE and install["status"] != "In Use":
-                                    continue
-                                if CONTENT_0 == False:
-                                    CONTENT_0 = True
-                                    temp_string_builder.append(f"### {software_id} - {software['name']}")
-                                    
-                                if CONTENT_1 == False:
-                                    CONTENT_1 = True
-                                    temp_string_builder.append(f"- v{version}")
-                                if show_usage:
-                                    print(f"\t\t\tInstalled on {install['user']} @ {install['name']} [Device: {install['status']}]")
-                                if install['description']:
-                                    temp_string_builder.append(f"""\t- Installed: {install['user']} @ {install['name']} [Device: {install['status']}]  
-        {install['description']}""")
-                                    if show_usage:
-                                        print(f"\t\t\t\t{install['description']}")
-                                else:
-                                    temp_string_builder.append(f"""\t- Installed: {install['user']} @ {install['name']} [Device: {install['status']}]""")
-
-                    
-                    for user in software["users"]:
-                        temp_string_builder.append(f"\t- User: {user['user']} [State: {user['state']}] w/{user['license']} licenses - Last used: {'N/A' if not user['last_use'] else user['last_use']}")
-                        if show_usage:
-                            print(f"\t\t\tUser: {user['user']} [State: {user['state']}] w/{user['license']} licenses - Last used: {'N/A' if not user['last_use'] else user['last_use']}")
-                    for license in software["licenses"]:
-                        temp_string_builder.append(f"\t- License: {license['license']} {license['contract_id']}")
-                        if show_usage:
-                            print(f"\t\t\tLicense: {license['license']} {license['contract_id']}")
-
-                    
-                if len(temp_string_builder) == 1:
+    def __print_report_group(cls, kind:str, vendor_id:str, vendor:Dict[str, Any], software_list:List[Any], show_usage:bool=False):
+        if kind == "summary":
+            for software_id, software, _ in software_list:
+                print(f"{vendor_id} - {vendor['name']} - {software_id} - {software['name']}")
+            return
+
+        print(f"{vendor_id} - {vendor['name']}")
+        for software_id, software, versions in software_list:
+            print(f"\t{software_id} - {software['name']}")
+            for version, installs in versions.items():
+                print(f"\t\t{software['name']} v{version}")
+                if not show_usage:
                     continue
-                temp_string_builder.append("")
-                temp_string_builder.append("______\n")
-                
-                string_builder.extend(temp_string_builder)
-
-        
-        if write:
-            with open("./message.md", "w") as file_handle:
-                file_handle.write("\n".join(string_builder))
+                for install in installs:
+                    if not cls.settings.VERBOSE and not install_in_use(install):
+                        continue
+                    print(f"\t\t\tInstalled on {install['user']} @ {install['name']} [Device: {install['status']}]")
+                    if install['description']:
+                        print(f"\t\t\t\t{install['description']}")
+            if show_usage:
+                for user in software["users"]:
+                    print(f"\t\t\tUser: {user['user']} [State: {user['state']}] w/{user['license']} licenses - Last used: {'N/A' if not user['last_use'] else user['last_use']}")
+                for license in software["licenses"]:
+                    print(f"\t\t\tLicense: {license['license']} {license['contract_id']}")
+
+
+    def __write_report_group(cls, writer:ReportWriter, kind:str, vendor_id:str, vendor:Dict[str, Any], software_list:List[Any]):
+        if kind == "summary":
+            for software_id, software, _ in software_list:
+                writer.write_summary(vendor_id, vendor, software_id, software)
+        else:
+            writer.write_vendor(vendor_id, vendor, software_list)
+
+
+    def write_report(cls, sink:TextIO, vendor_id_list:List[str]=[], software_id_list:List[str]=[], report_format:str="markdown"):
+        if report_format not in REPORT_WRITERS:
+            raise ValueError(f"Unknown report format: '{report_format}'")
+        cls.__ensure_software(vendor_id_list)
+        writer = REPORT_WRITERS[report_format](sink, include_all=cls.settings.VERBOSE)
+        writer.begin()
+        for group in cls.__report_groups(vendor_id_list=vendor_id_list, software_id_list=software_id_list):
+            cls.__write_report_group(writer, *group)
+        writer.end()
+        return writer.records
+
+
+    def list_software(cls, vendor_id_list:List[str]=[], software_id_list:List[str]=[], write:bool=False, show_usage:bool=False,
+                      output_path:str="./message.md", report_format:str="markdown"):
+        if report_format not in REPORT_WRITERS:
+            raise ValueError(f"Unknown report format: '{report_format}'")
+        cls.__ensure_software(vendor_id_list)
+        string_builder: List[str] = []
+        writers = [MarkdownReportWriter(None, include_all=cls.settings.VERBOSE, lines=string_builder)]
+        with ExitStack() as stack:
+            if write:
+                file_handle = stack.enter_context(open(output_path, "w", newline="" if report_format == "csv" else None))
+                writers.append(REPORT_WRITERS[report_format](file_handle, include_all=cls.settings.VERBOSE))
+            for writer in writers:
+                writer.begin()
+            for group in cls.__report_groups(vendor_id_list=vendor_id_list, software_id_list=software_id_list):
+                cls.__print_report_group(*group, show_usage=show_usage)
+                for writer in writers:
+                    cls.__write_report_group(writer, *group)
+            for writer in writers:
+                writer.end()
         return string_builder
 
 
+    def __sync_index(cls, CACHE_TYPE:str):
+        if CACHE_TYPE == "VENDOR":
+            index, register = cls._vendor_index, cls.VendorRegister
+            for vendor_id, vendor in register.items():
+                index.add(vendor_id, vendor["name"])
+        elif CACHE_TYPE == "SOFTWARE":
+            index, register = cls._software_index, cls.SoftwareRegister
+            for software_id, software in register.items():
+                index.add(software_id, software["name"], publisher_id=software["publisher_id"],
+                          category=software["category"], status=software["status"])
+        else:
+            raise KeyError(f"Key '{CACHE_TYPE}' does not exist")
+        for key in index.keys():
+            if key not in register:
+                index.remove(key)
+
+
+    def find_software(cls, terms:List[str]=[], match_all:bool=False, prefix:bool=False, publisher_id:Optional[str]=None, category:Optional[str]=None,
+                      status:Optional[str]=None):
+        cls.__ensure_software([publisher_id] if publisher_id else None)
+        if len(cls._software_index) != len(cls.SoftwareRegister):
+            cls.__sync_index("SOFTWARE")
+        return cls._software_index.search(terms, match_all=match_all, prefix=prefix, publisher_id=publisher_id, category=category, status=status)
+
+
+    def find_vendors(cls, terms:List[str]=[], match_all:bool=False, prefix:bool=False):
+        cls.__ensure_vendors()
+        if len(cls._vendor_index) != len(cls.VendorRegister):
+            cls.__sync_index("VENDOR")
+        return cls._vendor_index.search(terms, match_all=match_all, prefix=prefix)
+
+
     def filter_software(cls, filter_software:List[str]=[]):
-        software_ids = []
-        for key,software in cls.SoftwareRegister.items():
-            for filter in filter_software:
-                if filter in software["name"].lower():
-                    software_ids.append(key)
-                    break
-        return software_ids
+        if not filter_software:
+            return []
+        return cls.find_software(filter_software)
 
 
     def filter_vendors(cls, filter_vendor:List[str]=[]):
-        vendor_ids = []
-        for key,vendor in cls.VendorRegister.items():
-            for filter in filter_vendor:
-                if filter in vendor["name"].lower():
-                    vendor_ids.append(key)
-                    break
-        return vendor_ids
+        if not filter_vendor:
+            return []
+        return cls.find_vendors(filter_vendor)
 
 
     def list_vendors(cls, vendor_id_list:List[str]=[]):
+        cls.__ensure_vendors()
         if vendor_id_list:
             for vendor_id in vendor_id_list:
                 print(f"{vendor_id} - {cls.VendorRegister[vendor_id]['name']}")
@@ -413,43 +1139,58 @@ class FreshService(BaseSettings):
 
 
     def list_templates(cls):
-        cls.__load_templates()
         print("Defined FreshService template")
-        for template_key in cls.FRESH_TEMPLATES:
-            print(f"\t{template_key}: {cls.FRESH_TEMPLATES[template_key]['subject']}")
-    
+        for template_key in cls.templates.names():
+            print(f"\t{template_key}: {cls.templates[template_key]['subject']}")
 
-    def generate_ticket(cls, message: str, subject:str=None, template_name:str="DEFAULT"):
-        if cls.settings.VERBOSE:
-            print("Creating ticket")
-        cls.__load_templates()
 
-        if template_name not in cls.FRESH_TEMPLATES:
-            print(f"Template not found: '{template_name}'")
+    def __build_ticket(cls, message:str, subject:Optional[str]=None, template_name:str="DEFAULT"):
+        if template_name not in cls.templates:
+            raise KeyError(f"Template not found: '{template_name}'")
+        description = render_markdown(read_message(message))
+        if not description.strip():
+            raise ValueError("Missing ticket content: description")
+        return cls.templates.render(template_name, description, subject)
+
+
+    def __submit_ticket(cls, message:str, subject:Optional[str]=None, template_name:str="DEFAULT"):
+        # Rendering happens on the worker, so it overlaps with the other workers' requests
+        try:
+            ticket_object = cls.__build_ticket(message, subject, template_name)
+        except (KeyError, ValueError) as e:
+            return {"id": None, "subject": subject, "error": e.args[0]}
+        ticket, error = cls.__create_new_ticket(ticket_object=ticket_object)
+        if error:
+            return {"id": None, "subject": ticket_object["subject"], "error": error}
+        return {"id": ticket["id"], "subject": ticket["subject"], "error": None}
+
+
+    def generate_tickets(cls, batch:List[Dict[str, Any]]):
+        logger.debug("Creating %d tickets", len(batch))
+        results: List[Optional[Dict[str, Any]]] = [None] * len(batch)
+        with ThreadPoolExecutor(max_workers=cls.settings.MAX_WORKERS, thread_name_prefix="FreshService") as executor:
+            futures = {executor.submit(cls.__submit_ticket, ticket["message"], ticket.get("subject"), ticket.get("template_name", "DEFAULT")): i
+                       for i, ticket in enumerate(batch)}
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    results[i] = future.result()
+                except Exception as e:
+                    results[i] = {"id": None, "subject": batch[i].get("subject"), "error": str(e)}
+        return results
+
+
+    def generate_ticket(cls, message: str, subject:Optional[str]=None, template_name:str="DEFAULT"):
+        logger.debug("Creating ticket")
+        if template_name not in cls.templates:
+            logger.warning("Template not found: '%s'", template_name)
             cls.list_templates()
             return
-        
-        ticket_object = cls.FRESH_TEMPLATES["DEFAULT"]
-        ticket_object["workspace_id"] = cls.settings.FRESH_WORKSPACE_ID
-        ticket_object["email"] = cls.settings.FRESH_DEFAULT_CONTACT_EMAIL
-        ticket_object["cc_emails"].append(cls.settings.FRESH_DEFAULT_CONTACT_EMAIL)
-        ticket_object["department_id"] = cls.settings.FRESH_DEFAULT_DEPT_ID
-        ticket_object["group_id"] = cls.settings.FRESH_DEFAULT_GROUP_ID
-        ticket_object["category"] = cls.settings.FRESH_DEFAULT_CATEGORY
-
-        ticket_object["subject"] = subject.strip() if subject else cls.settings.FRESH_DEFAULT_SUBJECT
-        
-        for key,value in cls.FRESH_TEMPLATES[template_name].items():
-            ticket_object.update({key:value})
-
-        if exists(message) and isfile(message):
-            with open(message) as message_fh:
-                ticket_object["description"] = markdown.markdown(message_fh.read().strip())
-        else:
-            ticket_object["description"] = markdown.markdown(message.strip())
-        
-        if not ticket_object["description"].strip():
-            raise ValueError("Missing ticket content: description")
-        
-        cls.__create_new_ticket(ticket_object=ticket_object)
-        
+
+        ticket_object = cls.__build_ticket(message, subject, template_name)
+        ticket, error = cls.__create_new_ticket(ticket_object=ticket_object)
+        if error:
+            logger.warning("Ticket was not created.\n%s", error, extra={"event": "ticket_failed"})
+            return
+        logger.info("Ticket successfully created - %s - %s", ticket['id'], ticket['subject'], extra={"event": "ticket_created", "ticket_id": ticket['id']})
+        return ticket["id"]
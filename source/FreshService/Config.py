@@ -1,9 +1,11 @@
 from pydantic import Field
+from typing import Dict
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
     FRESH_DOMAIN: str = Field()
+    FRESH_PROTOCOL: str = Field(default="https")
     FRESH_KEY: str = Field()
     FRESH_TEMPLATE_FILEPATH: str = Field()
     FRESH_PAGE_SIZE: int = Field()
@@ -17,7 +19,34 @@ class Settings(BaseSettings):
 
     MAX_REQUEST_TIMEOUT: int = Field()
     MAX_REQUEST_RETRIES: int = Field()
+    MAX_POOL_SIZE: int = Field(default=10)
+    HTTP2: bool = Field(default=False)
+    MAX_WORKERS: int = Field(default=4)
+    MAX_CONCURRENCY: int = Field(default=50)
+    ASYNC_EXPANSION: bool = Field(default=False)
+    RATE_LIMIT_PER_MINUTE: int = Field(default=0)
+
+    CACHE_BACKEND: str = Field(default="json")
+    CACHE_DATABASE: str = Field(default="./.freshservice_cache.sqlite")
+    CACHE_MAX_STALENESS: Dict[str, int] = Field(default={"VENDOR": 604800, "SOFTWARE": 86400})
+
+    ASSET_CACHE_SIZE: int = Field(default=50000)
+    ASSET_CACHE_TTL: int = Field(default=86400)
+    ASSET_LOOKUP_MODE: str = Field(default="auto")
+    ASSET_PREFETCH_THRESHOLD: int = Field(default=1000)
+    ASSET_HTML_PARSER: str = Field(default="builtin")
+    ASSET_DESCRIPTION_CACHE_SIZE: int = Field(default=10000)
+
+    EXPANSION_JOURNAL: str = Field(default="./.freshservice_expansion.jsonl")
+    EXPANSION_RESUME_WINDOW: int = Field(default=86400)
+    EXPANSION_RETRIES: int = Field(default=2)
 
     VERBOSE: bool = Field()
+    LOG_FORMAT: str = Field(default="text")
 
     model_config = SettingsConfigDict(env_file='.env', env_file_encoding='utf-8', extra='ignore')
+
+
+def load_settings() -> Settings:
+    # The required fields come from the environment and .env, which mypy cannot see
+    return Settings()  # type: ignore[call-arg]
@@ -0,0 +1,286 @@
+import re
+import threading
+import warnings
+from collections import OrderedDict
+from hashlib import blake2b
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+
+SEPARATOR = "  |  "
+HTML_PARSERS = ("builtin", "bs4")
+
+_ASCII_SPACES = " \n\t\x0c\r"
+_SKIPPED_TAGS = frozenset(("script", "style", "template", "rt", "rp"))
+_PRESERVED_TAGS = frozenset(("pre",))
+_HEAD_TAGS = frozenset(("base", "link", "meta", "script", "style", "title"))
+# Elements that end an implied head, any other element following a leading <style> or <meta> is kept inside it
+_BODY_TAGS = frozenset((
+    "a", "abbr", "acronym", "address", "b", "bdo", "big", "blockquote", "br", "center", "cite", "code", "dd", "dfn", "dir", "div", "dl", "dt",
+    "em", "fieldset", "font", "form", "h1", "h2", "h3", "h4", "h5", "h6", "hr", "i", "img", "kbd", "li", "map", "menu", "ol", "p", "pre", "q",
+    "s", "samp", "small", "span", "strike", "strong", "sub", "sup", "table", "tt", "u", "ul", "var",
+))
+# Void elements as lxml (libxml2) knows them, wbr, embed, source and track still take content there
+_VOID_TAGS = frozenset(("area", "base", "basefont", "br", "col", "frame", "hr", "img", "input", "isindex", "link", "meta", "param"))
+# Open elements a start tag implicitly ends, as lxml (libxml2) applies them. Text either side of an end tag for an
+# element that was already ended this way stays one string
+_CLOSED_BY = {tag: frozenset(closed.split()) for tag, closed in {
+    "a": "a",
+    "address": "p ul",
+    "blockquote": "p",
+    "caption": "p",
+    "center": "b font i p",
+    "col": "caption p",
+    "colgroup": "caption colgroup p",
+    "dd": "address dir dt menu p pre",
+    "dir": "p",
+    "div": "p",
+    "dl": "address dir dt menu p pre",
+    "dt": "address dd dir menu p pre",
+    "fieldset": "a h1 h2 h3 h4 h5 h6 legend p pre",
+    "form": "address dir dl form h1 h2 h3 h4 h5 h6 menu ol p pre ul",
+    "frameset": "p",
+    "h1": "p",
+    "h2": "p",
+    "h3": "p",
+    "h4": "p",
+    "h5": "p",
+    "h6": "p",
+    "hr": "p",
+    "li": "address dl h1 h2 h3 h4 h5 h6 li p pre",
+    "menu": "p ul",
+    "ol": "p",
+    "optgroup": "option",
+    "option": "option",
+    "p": "b big h1 h2 h3 h4 h5 h6 i p s small strike tt u",
+    "pre": "p ul",
+    "table": "a h1 h2 h3 h4 h5 h6 p pre",
+    "tbody": "caption colgroup p tbody td tfoot th thead tr",
+    "td": "a b font i p span td th u",
+    "tfoot": "caption colgroup p tbody td th thead tr",
+    "th": "a b font i p span td th u",
+    "thead": "caption colgroup",
+    "tr": "caption colgroup p td th tr",
+    "ul": "address dir menu p pre",
+}.items()}
+# An end tag only reaches past open elements of lower or equal priority, otherwise lxml ignores it
+_END_PRIORITY = {"div": 150, "td": 160, "th": 160, "tr": 170, "thead": 180, "tbody": 180, "tfoot": 180, "table": 190}
+# Markup the streaming parser does not reproduce exactly: document structure lxml rearranges, raw-text elements and
+# implied ruby ends. Descriptions from the rich text editor never contain these, pasted documents occasionally do
+_UNSUPPORTED = re.compile(r"<(?:/?(?:html|head|body|title|textarea|xmp|plaintext|listing|iframe|noembed|noframes|ruby|rt|rp)\b|!\[CDATA\[|\?)", re.I)
+# lxml drops a tag, comment or declaration left unterminated at the end of the document, html.parser keeps it as text
+_INCOMPLETE_MARKUP = re.compile(r"<(?:[a-zA-Z]|/[^>]|!)")
+
+_BeautifulSoup = None
+
+
+class _TextParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.strings: List[str] = []
+        self._data: List[str] = []
+        self._open: List[str] = []
+        self._leading = True
+        self._head = False
+        self._body = False
+        self._skipped = 0
+        self._preserved = 0
+
+    def __append(self, data: str):
+        if not data or self._skipped:
+            return
+        if not self._preserved and not data.strip(_ASCII_SPACES):
+            data = "\n" if "\n" in data else " "
+        self.strings.append(data)
+
+    def __flush(self):
+        if not self._data:
+            return
+        data = "".join(self._data)
+        self._data = []
+        if not self._body and not self._open:
+            text = data.lstrip(_ASCII_SPACES)
+            if text:
+                # The first text outside an element opens the implied body, the whitespace ahead of it stays a string of its own
+                self.__append(data[:len(data) - len(text)])
+                self._body = True
+                data = text
+        self.__append(data)
+
+    def handle_data(self, data: str):
+        if self._leading:
+            # Whitespace ahead of the first tag or text never reaches the document
+            data = data.lstrip(_ASCII_SPACES)
+            if not data:
+                return
+            self._leading = False
+        self._data.append(data)
+
+    def handle_starttag(self, tag: str, attrs):
+        self.__flush()
+        self._leading = False
+        if not self._body:
+            if tag in _HEAD_TAGS:
+                self._head = True
+            elif not self._head or (tag in _BODY_TAGS and not self._open):
+                self._body = True
+        closed_by = _CLOSED_BY.get(tag)
+        while closed_by and self._open and self._open[-1] in closed_by:
+            self.__pop()
+        if tag in _VOID_TAGS:
+            return
+        self._open.append(tag)
+        if tag in _SKIPPED_TAGS:
+            self._skipped += 1
+        elif tag in _PRESERVED_TAGS:
+            self._preserved += 1
+
+    def __pop(self):
+        closed = self._open.pop()
+        if closed in _SKIPPED_TAGS:
+            self._skipped -= 1
+        elif closed in _PRESERVED_TAGS:
+            self._preserved -= 1
+
+    def __is_open(self, tag: str) -> bool:
+        priority = _END_PRIORITY.get(tag, 100)
+        for name in reversed(self._open):
+            if name == tag:
+                return True
+            if _END_PRIORITY.get(name, 100) > priority:
+                return False
+        return False
+
+    def handle_endtag(self, tag: str):
+        if not self.__is_open(tag):
+            # lxml ignores end tags without a matching open element, so the text around them stays a single string
+            self._leading = False
+            return
+        self.__flush()
+        self._leading = False
+        while self._open[-1] != tag:
+            self.__pop()
+        self.__pop()
+
+    def handle_comment(self, data: str):
+        self.__flush()
+
+    def handle_decl(self, decl: str):
+        self.__flush()
+
+    def handle_pi(self, data: str):
+        self.__flush()
+
+    def unknown_decl(self, data: str):
+        self.__flush()
+
+    def close(self):
+        if _INCOMPLETE_MARKUP.match(self.rawdata):
+            self.rawdata = ""
+        super().close()
+        self.__flush()
+
+
+def builtin_to_text(html: str) -> str:
+    parser = _TextParser()
+    parser.feed(html.replace("\r\n", "\n").replace("\r", "\n").replace("\x00", "\ufffd"))
+    parser.close()
+    return "".join(parser.strings).replace("\n", SEPARATOR).strip()
+
+
+def bs4_to_text(html: str) -> str:
+    global _BeautifulSoup
+    # bs4 and lxml dominate import time, and are only needed once a description falls back to them
+    if _BeautifulSoup is None:
+        from bs4 import BeautifulSoup, MarkupResemblesLocatorWarning
+
+        warnings.filterwarnings("ignore", category=MarkupResemblesLocatorWarning)
+        _BeautifulSoup = BeautifulSoup
+    return _BeautifulSoup(html, "lxml").text.replace("\n", SEPARATOR).strip()
+
+
+def bs4_available() -> bool:
+    if _BeautifulSoup is not None:
+        return True
+    try:
+        import bs4  # noqa: F401
+        import lxml  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class HtmlTextConverter:
+    _shared: Optional["HtmlTextConverter"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, parser: str = "builtin", max_size: int = 10000):
+        if parser not in HTML_PARSERS:
+            raise ValueError(f"Unknown HTML parser: '{parser}'")
+        self.parser = parser
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.fallbacks = 0
+        self.evictions = 0
+        self._fallback: Optional[bool] = None
+        self._entries: OrderedDict[bytes, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, parser: str = "builtin", max_size: int = 10000) -> "HtmlTextConverter":
+        # One converter serves every client in the process, so the cache size of the latest caller applies to all of them
+        with cls._shared_lock:
+            if cls._shared is None or cls._shared.parser != parser:
+                cls._shared = cls(parser=parser, max_size=max_size)
+            else:
+                cls._shared.resize(max_size)
+            return cls._shared
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __to_text(self, html: str) -> str:
+        if self.parser == "bs4":
+            return bs4_to_text(html)
+        if _UNSUPPORTED.search(html):
+            if self._fallback is None:
+                self._fallback = bs4_available()
+            if self._fallback:
+                with self._lock:
+                    self.fallbacks += 1
+                return bs4_to_text(html)
+        return builtin_to_text(html)
+
+    def resize(self, max_size: int):
+        with self._lock:
+            self.max_size = max_size
+            self.__evict()
+
+    def __evict(self):
+        while self.max_size and len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def convert(self, html: str) -> str:
+        # Machines built from one image share their description, so identical markup is only parsed once
+        key = blake2b(html.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        with self._lock:
+            text = self._entries.get(key)
+            if text is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return text
+            self.misses += 1
+        text = self.__to_text(html)
+        with self._lock:
+            self._entries[key] = text
+            self.__evict()
+        return text
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses, "fallbacks": self.fallbacks, "evictions": self.evictions}
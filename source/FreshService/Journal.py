@@ -0,0 +1,84 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+from time import time
+from typing import Any, Dict, Iterable, Optional, TextIO
+
+from FreshService.Records import RECORD_TYPES, to_json
+
+logger = logging.getLogger(__name__)
+
+
+class ExpansionJournal:
+    def __init__(self, filepath: str, max_age: int = 86400):
+        self.filepath = filepath
+        self.max_age = max_age
+        self._fh: Optional[TextIO] = None
+        self._lock = threading.Lock()
+
+    def __entries(self):
+        with open(self.filepath, "r") as journal_fh:
+            for line_number, line in enumerate(journal_fh, 1):
+                try:
+                    yield json.loads(line), line
+                except json.JSONDecodeError:
+                    logger.debug("Skipping malformed journal line %d of %s", line_number, self.filepath)
+
+    def __ends_with_newline(self) -> bool:
+        with open(self.filepath, "rb") as journal_fh:
+            journal_fh.seek(-1, os.SEEK_END)
+            return journal_fh.read(1) == b"\n"
+
+    def __append(self, entry: Dict[str, Any]):
+        line = json.dumps(entry, default=to_json) + "\n"
+        with self._lock:
+            if self._fh is None:
+                self._fh = open(self.filepath, "a")
+                if self._fh.tell() and not self.__ends_with_newline():
+                    # An interrupted write leaves the last line incomplete, the next entry must not extend it
+                    self._fh.write("\n")
+            self._fh.write(line)
+            # Flushed per entry, so a crash or interrupt loses at most the applications still in flight
+            self._fh.flush()
+
+    def completed(self, software_id: str, software: Dict[str, Any]):
+        self.__append({"software_id": software_id, "status": "completed", "at": time(),
+                       **{field: software[field] for field in RECORD_TYPES}})
+
+    def failed(self, software_id: str, errors: Dict[str, str]):
+        self.__append({"software_id": software_id, "status": "failed", "at": time(), "errors": errors})
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        completed: Dict[str, Dict[str, Any]] = {}
+        if not self.max_age or not os.path.exists(self.filepath):
+            return completed
+        now = time()
+        for entry, _ in self.__entries():
+            if entry["status"] == "completed" and now - entry["at"] <= self.max_age:
+                completed[entry["software_id"]] = entry
+        return completed
+
+    def close(self):
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+
+    def clear(self, software_ids: Optional[Iterable[str]] = None):
+        self.close()
+        if not os.path.exists(self.filepath):
+            return
+        kept = []
+        if software_ids is not None:
+            # Checkpoints of applications outside this run stay resumable
+            software_ids = set(software_ids)
+            kept = [line for entry, line in self.__entries() if entry["software_id"] not in software_ids]
+        if not kept:
+            os.remove(self.filepath)
+            return
+        fd, temp_filepath = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.filepath)), prefix=".tmp-", suffix=".jsonl")
+        with os.fdopen(fd, "w") as journal_fh:
+            journal_fh.writelines(kept)
+        os.replace(temp_filepath, self.filepath)
@@ -0,0 +1,244 @@
+import json
+import logging
+import re
+import sys
+import threading
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, TextIO, Tuple
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+HOOK_EVENTS = ("before_request", "after_request", "before_phase", "after_phase")
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_NUMERIC_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def normalize_endpoint(url: str) -> str:
+    return _NUMERIC_SEGMENT.sub("/{id}", urlparse(url).path.rstrip("/")) or "/"
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                break
+        else:
+            i = len(self.buckets)
+        self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def cumulative(self) -> List[Tuple[Any, int]]:
+        total = 0
+        result = []
+        for bound, count in zip((*self.buckets, "+Inf"), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"count": self.count, "sum": self.sum, "max": self.max,
+                "buckets": {str(bound): count for bound, count in self.cumulative()}}
+
+
+class EndpointMetrics:
+    def __init__(self):
+        self.status: Dict[str, int] = {}
+        self.retries = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.latency = Histogram()
+
+    @property
+    def requests(self) -> int:
+        return sum(self.status.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"requests": self.requests, "status": dict(self.status), "retries": self.retries,
+                "bytes_sent": self.bytes_sent, "bytes_received": self.bytes_received, "latency": self.latency.to_dict()}
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hooks: Dict[str, List[Callable[..., Any]]] = {event: [] for event in HOOK_EVENTS}
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.endpoints: Dict[Tuple[str, str], EndpointMetrics] = {}
+            self.phases: Dict[str, Histogram] = {}
+            self.throttled = 0
+            self.waits = 0
+            self.wait_seconds = 0.0
+
+    def add_hook(self, event: str, callback: Callable[..., Any]):
+        if event not in self._hooks:
+            raise ValueError(f"Unknown metrics event: '{event}'")
+        self._hooks[event].append(callback)
+
+    def remove_hook(self, event: str, callback: Callable[..., Any]):
+        self._hooks[event].remove(callback)
+
+    def __emit(self, event: str, *args, **kwargs):
+        for callback in self._hooks[event]:
+            # A broken hook must never break the request or phase it observes
+            try:
+                callback(*args, **kwargs)
+            except Exception:
+                logger.exception("Metrics hook failed: %s", event, extra={"event": "hook_failed", "hook": event})
+
+    def __endpoint(self, method: str, endpoint: str) -> EndpointMetrics:
+        key = (method, endpoint)
+        if key not in self.endpoints:
+            self.endpoints[key] = EndpointMetrics()
+        return self.endpoints[key]
+
+    def before_request(self, method: str, url: str):
+        if self._hooks["before_request"]:
+            self.__emit("before_request", method=method, endpoint=normalize_endpoint(url), url=url)
+
+    def observe_request(self, method: str, url: str, status: Optional[int], elapsed: float, bytes_sent: int = 0,
+                        bytes_received: int = 0, error: Optional[BaseException] = None):
+        endpoint = normalize_endpoint(url)
+        with self._lock:
+            metrics = self.__endpoint(method, endpoint)
+            status_key = str(status) if status is not None else "error"
+            metrics.status[status_key] = metrics.status.get(status_key, 0) + 1
+            metrics.bytes_sent += bytes_sent
+            metrics.bytes_received += bytes_received
+            metrics.latency.observe(elapsed)
+            if status == 429:
+                self.throttled += 1
+        if self._hooks["after_request"]:
+            self.__emit("after_request", method=method, endpoint=endpoint, url=url, status=status, elapsed=elapsed, error=error)
+
+    def observe_retry(self, method: str, url: str):
+        with self._lock:
+            self.__endpoint(method, normalize_endpoint(url)).retries += 1
+
+    def observe_wait(self, seconds: float):
+        if seconds <= 0:
+            return
+        with self._lock:
+            self.waits += 1
+            self.wait_seconds += seconds
+
+    @contextmanager
+    def phase(self, name: str, **context):
+        self.__emit("before_phase", name=name, context=context)
+        error = None
+        start = perf_counter()
+        try:
+            yield
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            elapsed = perf_counter() - start
+            with self._lock:
+                if name not in self.phases:
+                    self.phases[name] = Histogram()
+                self.phases[name].observe(elapsed)
+            self.__emit("after_phase", name=name, context=context, elapsed=elapsed, error=error)
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"endpoints": {f"{method} {endpoint}": metrics.to_dict() for (method, endpoint), metrics in self.endpoints.items()},
+                    "rate_limit": {"throttled": self.throttled, "waits": self.waits, "wait_seconds": self.wait_seconds},
+                    "phases": {name: histogram.to_dict() for name, histogram in self.phases.items()}}
+
+    def to_json(self) -> str:
+        return json.dumps(self.summary(), indent=2)
+
+    def to_prometheus(self, prefix: str = "freshservice") -> str:
+        lines = []
+
+        def metric(name: str, kind: str, description: str):
+            lines.append(f"# HELP {prefix}_{name} {description}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+
+        def labels(**values) -> str:
+            return "{" + ",".join(f'{key}="{_escape_label(value)}"' for key, value in values.items()) + "}"
+
+        with self._lock:
+            endpoints = list(self.endpoints.items())
+            metric("requests_total", "counter", "API requests by endpoint and status")
+            for (method, endpoint), metrics in endpoints:
+                for status, count in metrics.status.items():
+                    lines.append(f"{prefix}_requests_total{labels(method=method, endpoint=endpoint, status=status)} {count}")
+            metric("request_retries_total", "counter", "API request retries by endpoint")
+            for (method, endpoint), metrics in endpoints:
+                lines.append(f"{prefix}_request_retries_total{labels(method=method, endpoint=endpoint)} {metrics.retries}")
+            metric("request_bytes_total", "counter", "Bytes transferred by endpoint and direction")
+            for (method, endpoint), metrics in endpoints:
+                lines.append(f"{prefix}_request_bytes_total{labels(method=method, endpoint=endpoint, direction='sent')} {metrics.bytes_sent}")
+                lines.append(f"{prefix}_request_bytes_total{labels(method=method, endpoint=endpoint, direction='received')} {metrics.bytes_received}")
+            metric("request_duration_seconds", "histogram", "API request latency by endpoint")
+            for (method, endpoint), metrics in endpoints:
+                for bound, count in metrics.latency.cumulative():
+                    lines.append(f"{prefix}_request_duration_seconds_bucket{labels(method=method, endpoint=endpoint, le=bound)} {count}")
+                lines.append(f"{prefix}_request_duration_seconds_sum{labels(method=method, endpoint=endpoint)} {metrics.latency.sum}")
+                lines.append(f"{prefix}_request_duration_seconds_count{labels(method=method, endpoint=endpoint)} {metrics.latency.count}")
+            metric("throttled_total", "counter", "Responses with HTTP-429")
+            lines.append(f"{prefix}_throttled_total {self.throttled}")
+            metric("rate_limit_waits_total", "counter", "Requests delayed by the rate limiter")
+            lines.append(f"{prefix}_rate_limit_waits_total {self.waits}")
+            metric("rate_limit_wait_seconds_total", "counter", "Time spent waiting on the rate limiter")
+            lines.append(f"{prefix}_rate_limit_wait_seconds_total {self.wait_seconds}")
+            metric("phase_duration_seconds", "summary", "Time spent per phase")
+            for name, histogram in self.phases.items():
+                lines.append(f"{prefix}_phase_duration_seconds_sum{labels(phase=name)} {histogram.sum}")
+                lines.append(f"{prefix}_phase_duration_seconds_count{labels(phase=name)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, sink: TextIO, metrics_format: str = "json"):
+        if metrics_format == "json":
+            sink.write(self.to_json())
+        elif metrics_format == "prometheus":
+            sink.write(self.to_prometheus())
+        else:
+            raise ValueError(f"Unknown metrics format: '{metrics_format}'")
+
+
+class JsonLogFormatter(logging.Formatter):
+    RESERVED = set(logging.LogRecord("", 0, "", 0, "", None, None).__dict__) | {"message", "asctime"}
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {"time": record.created, "level": record.levelname, "logger": record.name, "message": record.getMessage()}
+        data.update({key: value for key, value in record.__dict__.items() if key not in self.RESERVED})
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str)
+
+
+def configure_logging(verbose: bool = False, log_format: str = "text"):
+    # Only applies when the application has not configured logging itself, so library output keeps reaching stdout
+    package_logger = logging.getLogger("FreshService")
+    if verbose:
+        package_logger.setLevel(logging.DEBUG)
+    if package_logger.handlers or logging.getLogger().handlers:
+        return
+    package_logger.setLevel(logging.DEBUG if verbose else logging.INFO)
+    handler = logging.StreamHandler(sys.stdout)
+    if log_format == "json":
+        handler.setFormatter(JsonLogFormatter())
+    elif log_format == "text":
+        handler.setFormatter(logging.Formatter("%(message)s"))
+    else:
+        raise ValueError(f"Unknown log format: '{log_format}'")
+    package_logger.addHandler(handler)
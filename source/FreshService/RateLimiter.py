@@ -0,0 +1,117 @@
+import random
+import threading
+from collections import deque
+from email.utils import parsedate_to_datetime
+from time import monotonic, time
+from typing import Dict, Optional
+
+
+class RateLimiter:
+    def __init__(self, rate_per_minute: int = 0, burst: Optional[int] = None, backoff_base: float = 1.0, backoff_max: float = 60.0):
+        self.rate_per_minute = rate_per_minute
+        self.burst = burst
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.limit_total: Optional[int] = None
+        self.limit_remaining: Optional[int] = None
+        self.throttled = 0
+        self._tokens = float(self.capacity)
+        self._updated = monotonic()
+        self._pause_until = 0.0
+        self._sent: deque[float] = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self) -> int:
+        # The configured rate caps the tenant budget, so other integrations can keep a share of it
+        limits = [limit for limit in (self.rate_per_minute, self.limit_total) if limit]
+        return min(limits) if limits else 0
+
+    @property
+    def capacity(self) -> int:
+        if self.burst:
+            return self.burst
+        # A tenth of the minute budget lets short bursts through without tripping the API limit
+        return max(1, self.rate // 10)
+
+    def __refill(self, now: float):
+        if self.rate:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate / 60)
+        self._updated = now
+
+    def __prune(self, now: float):
+        while self._sent and self._sent[0] < now - 60:
+            self._sent.popleft()
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = monotonic()
+            self.__refill(now)
+            self.__prune(now)
+            wait = max(0.0, self._pause_until - now)
+            if self.rate:
+                self._tokens -= 1
+                if self._tokens < 0:
+                    wait = max(wait, -self._tokens * 60 / self.rate)
+            self._sent.append(now + wait)
+            return wait
+
+    def update(self, headers):
+        total = headers.get("X-RateLimit-Total")
+        remaining = headers.get("X-RateLimit-Remaining")
+        with self._lock:
+            now = monotonic()
+            self.__refill(now)
+            if total and str(total).isdigit():
+                self.limit_total = int(total)
+                self._tokens = min(self._tokens, self.capacity)
+            if remaining is not None and str(remaining).lstrip("-").isdigit():
+                self.limit_remaining = int(remaining)
+                # Never spend more than the API says is left in the current window
+                self._tokens = min(self._tokens, float(self.limit_remaining))
+
+    def pause(self, seconds: float):
+        with self._lock:
+            now = monotonic()
+            self.throttled += 1
+            self._pause_until = max(self._pause_until, now + seconds)
+            self._tokens = min(self._tokens, 0.0)
+            self._updated = now
+
+    def paused_for(self) -> float:
+        with self._lock:
+            return max(0.0, self._pause_until - monotonic())
+
+    def backoff(self, attempt: int) -> float:
+        delay = min(self.backoff_max, self.backoff_base * (2.0 ** max(0, attempt - 1)))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def retry_after(self, headers, attempt: int) -> float:
+        value = headers.get("retry-after")
+        if value:
+            try:
+                return max(0.0, float(value))
+            except ValueError:
+                pass
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time())
+            except (TypeError, ValueError):
+                pass
+        return self.backoff(attempt)
+
+    @property
+    def observed_rate(self) -> float:
+        with self._lock:
+            now = monotonic()
+            self.__prune(now)
+            return float(sum(1 for sent in self._sent if sent <= now))
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        observed_rate = self.observed_rate
+        with self._lock:
+            return {"rate_per_minute": self.rate,
+                    "configured_per_minute": self.rate_per_minute,
+                    "observed_per_minute": observed_rate,
+                    "limit_total": self.limit_total,
+                    "limit_remaining": self.limit_remaining,
+                    "throttled": self.throttled}
@@ -0,0 +1,108 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Tuple, Type
+
+POOL_SIZE = 100000
+_pool: Dict[str, str] = {}
+
+
+def intern(value):
+    if not isinstance(value, str):
+        return value
+    interned = _pool.get(value)
+    if interned is None:
+        # Strings that records already hold stay shared when the pool starts over, only new values miss the old ones
+        if len(_pool) >= POOL_SIZE:
+            _pool.clear()
+        interned = _pool[value] = value
+    return interned
+
+
+def clear_pool():
+    _pool.clear()
+
+
+class Record:
+    __slots__ = ()
+    __match_args__: Tuple[str, ...] = ()
+    INTERNED: Tuple[str, ...] = ()
+
+    def __post_init__(self):
+        for name in self.INTERNED:
+            setattr(self, name, intern(getattr(self, name)))
+
+    def __getitem__(self, key: str):
+        if key not in self.__match_args__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value: Any):
+        if key not in self.__match_args__:
+            raise KeyError(key)
+        setattr(self, key, intern(value) if key in self.INTERNED else value)
+
+    def __contains__(self, key: str):
+        return key in self.__match_args__
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__match_args__)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key) if key in self.__match_args__ else default
+
+    def keys(self):
+        return list(self.__match_args__)
+
+    def update(self, values: Dict[str, Any]):
+        for key, value in values.items():
+            self[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: getattr(self, key) for key in self.__match_args__}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]):
+        return cls(*(data.get(key) for key in cls.__match_args__))
+
+
+@dataclass(slots=True, eq=True)
+class InstallRecord(Record):
+    path: Any = None
+    version: Any = None
+    user: Any = None
+    name: Any = None
+    description: Any = None
+    status: Any = None
+    machine: Any = None
+
+    INTERNED = ("path", "version", "name", "description", "status")
+
+
+@dataclass(slots=True, eq=True)
+class UserRecord(Record):
+    user: Any = None
+    license: Any = None
+    state: Any = None
+    last_use: Any = None
+
+    INTERNED = ("state", "last_use")
+
+
+@dataclass(slots=True, eq=True)
+class LicenseRecord(Record):
+    license: Any = None
+    contract_id: Any = None
+
+
+RECORD_TYPES: Dict[str, Type[Record]] = {"installs": InstallRecord, "users": UserRecord, "licenses": LicenseRecord}
+
+
+def software_from_dict(software: Dict[str, Any]) -> Dict[str, Any]:
+    for field, record_type in RECORD_TYPES.items():
+        software[field] = [item if isinstance(item, record_type) else record_type.from_dict(item) for item in software.get(field, [])]
+    return software
+
+
+def to_json(value):
+    if isinstance(value, Record):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,146 @@
+import csv
+import json
+from typing import Any, Dict, List, Optional, TextIO
+
+
+def group_installs(installs: List[Any]) -> Dict[str, List[Any]]:
+    versions: Dict[str, List[Any]] = {}
+    for install in installs:
+        versions.setdefault(install["version"], []).append(install)
+    return versions
+
+
+def install_in_use(install) -> bool:
+    return bool(install["status"] == "In Use")
+
+
+class ReportWriter:
+    def __init__(self, sink: Optional[TextIO], include_all: bool = False):
+        self.sink = sink
+        self.include_all = include_all
+        self.records = 0
+
+    def installs(self, installs: List[Any]) -> List[Any]:
+        return [install for install in installs if self.include_all or install_in_use(install)]
+
+    def begin(self):
+        pass
+
+    def write_summary(self, vendor_id: str, vendor: Dict[str, Any], software_id: str, software: Dict[str, Any]):
+        raise NotImplementedError
+
+    def write_vendor(self, vendor_id: str, vendor: Dict[str, Any], software_list: List[Any]):
+        raise NotImplementedError
+
+    def end(self):
+        pass
+
+
+class MarkdownReportWriter(ReportWriter):
+    def __init__(self, sink: Optional[TextIO], include_all: bool = False, lines: Optional[List[str]] = None):
+        super().__init__(sink, include_all)
+        self.lines = lines
+        self._first = True
+
+    def __write_lines(self, lines: List[str]):
+        if self.lines is not None:
+            self.lines.extend(lines)
+        if self.sink is not None:
+            for line in lines:
+                if not self._first:
+                    self.sink.write("\n")
+                self.sink.write(line)
+                self._first = False
+        self.records += len(lines)
+
+    def write_summary(self, vendor_id: str, vendor: Dict[str, Any], software_id: str, software: Dict[str, Any]):
+        self.__write_lines([f"- {vendor_id} - {vendor['name']} - {software_id} - {software['name']}"])
+
+    def write_vendor(self, vendor_id: str, vendor: Dict[str, Any], software_list: List[Any]):
+        lines = [f"## {vendor_id} - {vendor['name']}\n"]
+        for software_id, software, versions in software_list:
+            header = False
+            for version, installs in versions.items():
+                installs = self.installs(installs)
+                if not installs:
+                    continue
+                if not header:
+                    header = True
+                    lines.append(f"### {software_id} - {software['name']}")
+                lines.append(f"- v{version}")
+                for install in installs:
+                    if install['description']:
+                        lines.append(f"""\t- Installed: {install['user']} @ {install['name']} [Device: {install['status']}]  
+        {install['description']}""")
+                    else:
+                        lines.append(f"""\t- Installed: {install['user']} @ {install['name']} [Device: {install['status']}]""")
+            for user in software["users"]:
+                lines.append(f"\t- User: {user['user']} [State: {user['state']}] w/{user['license']} licenses - Last used: {'N/A' if not user['last_use'] else user['last_use']}")
+            for license in software["licenses"]:
+                lines.append(f"\t- License: {license['license']} {license['contract_id']}")
+        if len(lines) == 1:
+            return
+        lines.append("")
+        lines.append("______\n")
+        self.__write_lines(lines)
+
+
+class CsvReportWriter(ReportWriter):
+    sink: TextIO
+
+    FIELDS = ["vendor_id", "vendor_name", "software_id", "software_name", "record", "version", "user", "machine", "name",
+              "status", "description", "path", "license", "contract_id", "state", "last_use"]
+
+    def begin(self):
+        self._writer = csv.DictWriter(self.sink, fieldnames=self.FIELDS, extrasaction="ignore")
+        self._writer.writeheader()
+
+    def __write_row(self, row: Dict[str, Any]):
+        self._writer.writerow(row)
+        self.records += 1
+
+    def write_summary(self, vendor_id: str, vendor: Dict[str, Any], software_id: str, software: Dict[str, Any]):
+        self.__write_row({"vendor_id": vendor_id, "vendor_name": vendor["name"], "software_id": software_id,
+                          "software_name": software["name"], "record": "software"})
+
+    def write_vendor(self, vendor_id: str, vendor: Dict[str, Any], software_list: List[Any]):
+        for software_id, software, versions in software_list:
+            base = {"vendor_id": vendor_id, "vendor_name": vendor["name"], "software_id": software_id, "software_name": software["name"]}
+            for version, installs in versions.items():
+                for install in self.installs(installs):
+                    self.__write_row({**base, "record": "install", "version": version, "user": install["user"], "machine": install["machine"],
+                                      "name": install["name"], "status": install["status"], "description": install["description"],
+                                      "path": install["path"]})
+            for user in software["users"]:
+                self.__write_row({**base, "record": "user", "user": user["user"], "license": user["license"], "state": user["state"],
+                                  "last_use": user["last_use"]})
+            for license in software["licenses"]:
+                self.__write_row({**base, "record": "license", "license": license["license"], "contract_id": license["contract_id"]})
+
+
+class JsonLinesReportWriter(ReportWriter):
+    sink: TextIO
+
+    def __write_object(self, data: Dict[str, Any]):
+        self.sink.write(json.dumps(data))
+        self.sink.write("\n")
+        self.records += 1
+
+    def write_summary(self, vendor_id: str, vendor: Dict[str, Any], software_id: str, software: Dict[str, Any]):
+        self.__write_object({"vendor_id": vendor_id, "vendor_name": vendor["name"], "software_id": software_id, "software_name": software["name"]})
+
+    def write_vendor(self, vendor_id: str, vendor: Dict[str, Any], software_list: List[Any]):
+        for software_id, software, versions in software_list:
+            self.__write_object({"vendor_id": vendor_id,
+                                 "vendor_name": vendor["name"],
+                                 "software_id": software_id,
+                                 "software_name": software["name"],
+                                 "versions": {version: [dict(install) for install in selected]
+                                              for version, installs in versions.items() if (selected := self.installs(installs))},
+                                 "users": [dict(user) for user in software["users"]],
+                                 "licenses": [dict(license) for license in software["licenses"]]})
+
+
+REPORT_WRITERS = {"markdown": MarkdownReportWriter,
+                  "csv": CsvReportWriter,
+                  "jsonl": JsonLinesReportWriter}
@@ -0,0 +1,116 @@
+import threading
+from typing import Dict, Iterable, List, Optional, Set
+
+
+class SearchIndex:
+    def __init__(self, ngram: int = 3):
+        self.ngram = ngram
+        self._texts: Dict[str, str] = {}
+        self._order: Dict[str, int] = {}
+        self._grams: Dict[str, Set[str]] = {}
+        self._attributes: Dict[str, Dict[str, Set[str]]] = {}
+        self._values: Dict[str, Dict[str, str]] = {}
+        self._counter = 0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._texts)
+
+    def __contains__(self, key):
+        return key in self._texts
+
+    def __fold(self, value) -> str:
+        return str(value).casefold() if value is not None else ""
+
+    def __split(self, text: str) -> Set[str]:
+        return {text[i:i + self.ngram] for i in range(len(text) - self.ngram + 1)}
+
+    def add(self, key: str, text: str, **attributes):
+        folded = self.__fold(text)
+        with self._lock:
+            if key in self._texts:
+                if self._texts[key] == folded and self._values[key] == {field: self.__fold(value) for field, value in attributes.items()}:
+                    return
+                order = self._order[key]
+                self.remove(key)
+            else:
+                order = self._counter
+                self._counter += 1
+            self._texts[key] = folded
+            self._order[key] = order
+            for gram in self.__split(folded):
+                self._grams.setdefault(gram, set()).add(key)
+            self._values[key] = {}
+            for field, value in attributes.items():
+                value = self.__fold(value)
+                self._values[key][field] = value
+                self._attributes.setdefault(field, {}).setdefault(value, set()).add(key)
+
+    def remove(self, key: str):
+        with self._lock:
+            folded = self._texts.pop(key, None)
+            if folded is None:
+                return
+            self._order.pop(key)
+            for gram in self.__split(folded):
+                keys = self._grams.get(gram)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._grams[gram]
+            for field, value in self._values.pop(key).items():
+                keys = self._attributes[field][value]
+                keys.discard(key)
+                if not keys:
+                    del self._attributes[field][value]
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            return list(self._texts)
+
+    def clear(self):
+        with self._lock:
+            self._texts.clear()
+            self._order.clear()
+            self._grams.clear()
+            self._attributes.clear()
+            self._values.clear()
+
+    def __candidates(self, term: str) -> Iterable[str]:
+        grams = self.__split(term)
+        if not grams:
+            # Terms shorter than the n-gram size cannot use the index
+            return self._texts.keys()
+        postings = sorted((self._grams.get(gram, set()) for gram in grams), key=len)
+        return set.intersection(*postings) if postings[0] else set()
+
+    def substring(self, term: str) -> Set[str]:
+        term = self.__fold(term)
+        with self._lock:
+            return {key for key in self.__candidates(term) if term in self._texts[key]}
+
+    def prefix(self, term: str) -> Set[str]:
+        term = self.__fold(term)
+        with self._lock:
+            return {key for key in self.__candidates(term) if self._texts[key].startswith(term)}
+
+    def lookup(self, field: str, value) -> Set[str]:
+        with self._lock:
+            return set(self._attributes.get(field, {}).get(self.__fold(value), set()))
+
+    def search(self, terms: Iterable[str] = (), match_all: bool = False, prefix: bool = False, **attributes) -> List[str]:
+        match = self.prefix if prefix else self.substring
+        with self._lock:
+            result: Optional[Set[str]] = None
+            terms = [term for term in terms if term]
+            if terms:
+                matches = [match(term) for term in terms]
+                result = set.intersection(*matches) if match_all else set.union(*matches)
+            for field, value in attributes.items():
+                if value is None:
+                    continue
+                keys = self.lookup(field, value)
+                result = keys if result is None else result & keys
+            if result is None:
+                result = set(self._texts)
+            return sorted(result, key=self._order.__getitem__)
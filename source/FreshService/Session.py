@@ -0,0 +1,121 @@
+import asyncio
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class FreshSession:
+    def __init__(self, pool_size: int = 10, http2: bool = False, headers: Optional[Dict[str, str]] = None, auth: Optional[Tuple[str, str]] = None):
+        self.pool_size = max(1, pool_size)
+        self.http2 = http2
+        self.headers = dict(headers or {})
+        self.headers.setdefault("Connection", "keep-alive")
+        self.auth = auth
+        self._client: Any = None
+        self._lock = threading.Lock()
+
+    def __build_http2_client(self):
+        try:
+            import httpx
+        except ImportError:
+            return None
+        limits = httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+        try:
+            return httpx.Client(http2=True, limits=limits, headers=self.headers, auth=self.auth)
+        except ImportError:
+            # httpx is installed without the optional h2 package
+            return None
+
+    def __build_requests_client(self):
+        from requests import Session
+        from requests.adapters import HTTPAdapter
+
+        session = Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, pool_block=True, max_retries=0)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update(self.headers)
+        session.auth = self.auth
+        return session
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    client = self.__build_http2_client() if self.http2 else None
+                    self._client = client if client is not None else self.__build_requests_client()
+        return self._client
+
+    def request(self, method: str, url: str, **kwargs):
+        return self.client.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url: str, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def delete(self, url: str, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+    def close(self):
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class AsyncFreshSession:
+    def __init__(self, session: FreshSession, concurrency: int = 50):
+        self.session = session
+        self.concurrency = max(1, concurrency)
+        self._client: Any = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def __build_client(self):
+        try:
+            import httpx
+        except ImportError:
+            return None
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        try:
+            return httpx.AsyncClient(http2=self.session.http2, limits=limits, headers=self.session.headers, auth=self.session.auth)
+        except ImportError:
+            return httpx.AsyncClient(limits=limits, headers=self.session.headers, auth=self.session.auth)
+
+    async def request(self, method: str, url: str, on_send: Optional[Callable[[], None]] = None, **kwargs):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._client = self.__build_client()
+        async with self._semaphore:
+            # Called once a slot is free, so callers can time the request without the wait for MAX_CONCURRENCY
+            if on_send is not None:
+                on_send()
+            if self._client is None:
+                # Without httpx the pooled synchronous session is driven from worker threads
+                return await asyncio.to_thread(self.session.request, method, url, **kwargs)
+            return await self._client.request(method, url, **kwargs)
+
+    async def get(self, url: str, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self._semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
@@ -0,0 +1,332 @@
+import json
+import os
+import tempfile
+import threading
+from time import monotonic
+from typing import Any, Dict, Iterable, List, Optional, Set
+from urllib.parse import quote, unquote
+
+from FreshService.Records import RECORD_TYPES, to_json
+
+
+class CacheBackend:
+    partial_reads = False
+
+    def load_vendors(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def save_vendors(self, register: Dict[str, Any]):
+        raise NotImplementedError
+
+    def load_software(self, vendor_id_list: Optional[List[str]] = None) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def has_software(self) -> bool:
+        raise NotImplementedError
+
+    def save_software(self, register: Dict[str, Any]):
+        raise NotImplementedError
+
+    def upsert_software(self, register: Dict[str, Any], software_ids: Iterable[str]):
+        raise NotImplementedError
+
+    def delete_software(self, register: Dict[str, Any], software_ids: Iterable[str]):
+        raise NotImplementedError
+
+    def flush(self, register: Dict[str, Any]):
+        pass
+
+    def close(self):
+        pass
+
+
+def read_json(filepath: str) -> Dict[str, Any]:
+    with open(filepath, "r") as cache_fh:
+        register: Dict[str, Any] = json.load(cache_fh)
+    return register
+
+
+def write_json(filepath: str, register: Dict[str, Any]):
+    directory = os.path.dirname(os.path.abspath(filepath))
+    fd, temp_filepath = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w") as cache_fh:
+            json.dump(register, cache_fh, default=to_json)
+        os.replace(temp_filepath, filepath)
+    except BaseException:
+        if os.path.exists(temp_filepath):
+            os.remove(temp_filepath)
+        raise
+
+
+class JsonCacheBackend(CacheBackend):
+    def __init__(self, vendor_filepath: str, software_filepath: str, flush_interval: float = 30):
+        self.vendor_filepath = vendor_filepath
+        self.software_filepath = software_filepath
+        self.flush_interval = flush_interval
+        self._dirty = False
+        self._flushed = monotonic()
+        self._lock = threading.Lock()
+
+    def load_vendors(self) -> Dict[str, Any]:
+        return read_json(self.vendor_filepath)
+
+    def save_vendors(self, register: Dict[str, Any]):
+        write_json(self.vendor_filepath, register)
+
+    def load_software(self, vendor_id_list: Optional[List[str]] = None) -> Dict[str, Any]:
+        return read_json(self.software_filepath)
+
+    def has_software(self) -> bool:
+        return os.path.exists(self.software_filepath) and bool(read_json(self.software_filepath))
+
+    def save_software(self, register: Dict[str, Any]):
+        with self._lock:
+            write_json(self.software_filepath, register)
+            self._dirty = False
+            self._flushed = monotonic()
+
+    def upsert_software(self, register: Dict[str, Any], software_ids: Iterable[str]):
+        # The JSON file can only be rewritten as a whole, so partial updates are batched by flush_interval
+        with self._lock:
+            self._dirty = True
+            if monotonic() - self._flushed < self.flush_interval:
+                return
+        self.save_software(register)
+
+    def delete_software(self, register: Dict[str, Any], software_ids: Iterable[str]):
+        self.upsert_software(register, software_ids)
+
+    def flush(self, register: Dict[str, Any]):
+        if self._dirty:
+            self.save_software(register)
+
+
+class ShardedJsonCacheBackend(CacheBackend):
+    partial_reads = True
+
+    def __init__(self, vendor_filepath: str, software_directory: str, flush_interval: float = 30):
+        self.vendor_filepath = vendor_filepath
+        self.software_directory = software_directory
+        self.flush_interval = flush_interval
+        # Deleted applications are gone from the register, so remember which shard held each one
+        self._owners: Dict[str, str] = {}
+        self._dirty: Set[str] = set()
+        self._flushed = monotonic()
+        self._lock = threading.Lock()
+
+    def __shard_path(self, vendor_id: str) -> str:
+        return os.path.join(self.software_directory, f"{quote(str(vendor_id), safe='')}.json")
+
+    def __shards(self) -> List[str]:
+        if not os.path.isdir(self.software_directory):
+            return []
+        return [unquote(filename[:-len(".json")]) for filename in sorted(os.listdir(self.software_directory))
+                if filename.endswith(".json") and not filename.startswith(".tmp-")]
+
+    def __group(self, register: Dict[str, Any], vendor_ids: Optional[Set[str]] = None) -> Dict[str, Dict[str, Any]]:
+        shards: Dict[str, Dict[str, Any]] = {vendor_id: {} for vendor_id in vendor_ids or ()}
+        for software_id, software in register.items():
+            vendor_id = str(software.get("publisher_id"))
+            if vendor_ids is None or vendor_id in vendor_ids:
+                shards.setdefault(vendor_id, {})[software_id] = software
+        return shards
+
+    def __write_shards(self, shards: Dict[str, Dict[str, Any]]):
+        os.makedirs(self.software_directory, exist_ok=True)
+        for vendor_id, shard in shards.items():
+            if shard:
+                write_json(self.__shard_path(vendor_id), shard)
+            elif os.path.exists(self.__shard_path(vendor_id)):
+                os.remove(self.__shard_path(vendor_id))
+            for software_id in shard:
+                self._owners[software_id] = vendor_id
+
+    def load_vendors(self) -> Dict[str, Any]:
+        return read_json(self.vendor_filepath)
+
+    def save_vendors(self, register: Dict[str, Any]):
+        write_json(self.vendor_filepath, register)
+
+    def load_software(self, vendor_id_list: Optional[List[str]] = None) -> Dict[str, Any]:
+        vendor_ids = self.__shards() if vendor_id_list is None else [str(vendor_id) for vendor_id in vendor_id_list]
+        register = {}
+        for vendor_id in vendor_ids:
+            if not os.path.exists(self.__shard_path(vendor_id)):
+                continue
+            shard = read_json(self.__shard_path(vendor_id))
+            with self._lock:
+                for software_id in shard:
+                    self._owners[software_id] = vendor_id
+            register.update(shard)
+        return register
+
+    def has_software(self) -> bool:
+        return bool(self.__shards())
+
+    def save_software(self, register: Dict[str, Any]):
+        with self._lock:
+            shards = self.__group(register)
+            for vendor_id in set(self.__shards()) - set(shards):
+                shards[vendor_id] = {}
+            self._owners.clear()
+            self.__write_shards(shards)
+            self._dirty.clear()
+            self._flushed = monotonic()
+
+    def __mark(self, register: Dict[str, Any], software_ids: Iterable[str]):
+        for software_id in software_ids:
+            if software_id in self._owners:
+                self._dirty.add(self._owners[software_id])
+            if software_id in register:
+                self._dirty.add(str(register[software_id].get("publisher_id")))
+
+    def upsert_software(self, register: Dict[str, Any], software_ids: Iterable[str]):
+        with self._lock:
+            self.__mark(register, software_ids)
+            if monotonic() - self._flushed < self.flush_interval:
+                return
+        self.flush(register)
+
+    def delete_software(self, register: Dict[str, Any], software_ids: Iterable[str]):
+        self.upsert_software(register, software_ids)
+
+    def flush(self, register: Dict[str, Any]):
+        # Only shards touched since the last flush are rewritten, the register may hold just the vendors that were loaded
+        with self._lock:
+            if not self._dirty:
+                return
+            dirty, self._dirty = self._dirty, set()
+            for software_id in [software_id for software_id, vendor_id in self._owners.items() if vendor_id in dirty]:
+                del self._owners[software_id]
+            self.__write_shards(self.__group(register, dirty))
+            self._flushed = monotonic()
+
+
+class SqliteCacheBackend(CacheBackend):
+    partial_reads = True
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS vendors (
+            id TEXT PRIMARY KEY, name TEXT, updated_at TEXT, fetched_at INTEGER);
+        CREATE TABLE IF NOT EXISTS software (
+            id TEXT PRIMARY KEY, name TEXT, publisher_id TEXT, category TEXT, status TEXT, updated_at TEXT, fetched_at INTEGER);
+        CREATE TABLE IF NOT EXISTS installs (
+            software_id TEXT NOT NULL, path TEXT, version TEXT, user, name TEXT, description TEXT, status TEXT, machine);
+        CREATE TABLE IF NOT EXISTS users (
+            software_id TEXT NOT NULL, user, license, state TEXT, last_use TEXT);
+        CREATE TABLE IF NOT EXISTS licenses (
+            software_id TEXT NOT NULL, license, contract_id);
+        CREATE INDEX IF NOT EXISTS software_publisher_idx ON software (publisher_id);
+        CREATE INDEX IF NOT EXISTS software_name_idx ON software (name);
+        CREATE INDEX IF NOT EXISTS installs_software_idx ON installs (software_id);
+        CREATE INDEX IF NOT EXISTS users_software_idx ON users (software_id);
+        CREATE INDEX IF NOT EXISTS licenses_software_idx ON licenses (software_id);
+    """
+    SOFTWARE_COLUMNS = ("name", "publisher_id", "category", "status", "updated_at", "fetched_at")
+    CHILD_COLUMNS = {"installs": ("path", "version", "user", "name", "description", "status", "machine"),
+                     "users": ("user", "license", "state", "last_use"),
+                     "licenses": ("license", "contract_id")}
+    # Stay below SQLITE_MAX_VARIABLE_NUMBER on older sqlite builds
+    CHUNK_SIZE = 500
+
+    def __init__(self, filepath: str):
+        import sqlite3
+
+        self.filepath = filepath
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(filepath, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(self.SCHEMA)
+
+    def __chunks(self, values: List[str]):
+        for i in range(0, len(values), self.CHUNK_SIZE):
+            yield values[i:i + self.CHUNK_SIZE]
+
+    def load_vendors(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._connection.execute("SELECT id, name, updated_at, fetched_at FROM vendors ORDER BY rowid").fetchall()
+        register = {}
+        for vendor_id, name, updated_at, fetched_at in rows:
+            register[vendor_id] = {"name": name, "software": []}
+            if updated_at is not None or fetched_at is not None:
+                register[vendor_id].update({"updated_at": updated_at, "fetched_at": fetched_at})
+        return register
+
+    def save_vendors(self, register: Dict[str, Any]):
+        rows = [(vendor_id, vendor["name"], vendor.get("updated_at"), vendor.get("fetched_at")) for vendor_id, vendor in register.items()]
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM vendors")
+            self._connection.executemany("INSERT INTO vendors (id, name, updated_at, fetched_at) VALUES (?, ?, ?, ?)", rows)
+
+    def __load_children(self, table: str, software_ids: Optional[List[str]], register: Dict[str, Any]):
+        # Column order matches the field order of the record types
+        columns = self.CHILD_COLUMNS[table]
+        query = f"SELECT software_id, {', '.join(columns)} FROM {table}"
+        if software_ids is None:
+            chunks: Iterable[Any] = [self._connection.execute(f"{query} ORDER BY rowid")]
+        else:
+            chunks = (self._connection.execute(f"{query} WHERE software_id IN ({', '.join('?' * len(chunk))}) ORDER BY rowid", chunk)
+                      for chunk in self.__chunks(software_ids))
+        for cursor in chunks:
+            for row in cursor:
+                software = register.get(row[0])
+                if software is not None:
+                    software[table].append(RECORD_TYPES[table](*row[1:]))
+
+    def load_software(self, vendor_id_list: Optional[List[str]] = None) -> Dict[str, Any]:
+        query = f"SELECT id, {', '.join(self.SOFTWARE_COLUMNS)} FROM software"
+        register = {}
+        with self._lock:
+            if vendor_id_list is None:
+                cursors = [self._connection.execute(f"{query} ORDER BY rowid")]
+            else:
+                cursors = [self._connection.execute(f"{query} WHERE publisher_id IN ({', '.join('?' * len(chunk))}) ORDER BY rowid", chunk)
+                           for chunk in self.__chunks(list(vendor_id_list))]
+            for cursor in cursors:
+                for row in cursor:
+                    register[row[0]] = {**dict(zip(self.SOFTWARE_COLUMNS, row[1:])), "users": [], "installs": [], "licenses": []}
+            software_ids = None if vendor_id_list is None else list(register)
+            for table in self.CHILD_COLUMNS:
+                self.__load_children(table, software_ids, register)
+        return register
+
+    def has_software(self) -> bool:
+        with self._lock:
+            return self._connection.execute("SELECT 1 FROM software LIMIT 1").fetchone() is not None
+
+    def __write_software(self, register: Dict[str, Any], software_ids: Iterable[str]):
+        software_ids = [software_id for software_id in software_ids if software_id in register]
+        for chunk in self.__chunks(software_ids):
+            for table in self.CHILD_COLUMNS:
+                self._connection.execute(f"DELETE FROM {table} WHERE software_id IN ({', '.join('?' * len(chunk))})", chunk)
+        self._connection.executemany(f"INSERT OR REPLACE INTO software (id, {', '.join(self.SOFTWARE_COLUMNS)}) VALUES (?{', ?' * len(self.SOFTWARE_COLUMNS)})",
+                                     ((software_id, *(register[software_id].get(column) for column in self.SOFTWARE_COLUMNS))
+                                      for software_id in software_ids))
+        for table, columns in self.CHILD_COLUMNS.items():
+            self._connection.executemany(f"INSERT INTO {table} (software_id, {', '.join(columns)}) VALUES (?{', ?' * len(columns)})",
+                                         ((software_id, *(item[column] for column in columns))
+                                          for software_id in software_ids for item in register[software_id][table]))
+
+    def save_software(self, register: Dict[str, Any]):
+        with self._lock, self._connection:
+            for table in ("software", *self.CHILD_COLUMNS):
+                self._connection.execute(f"DELETE FROM {table}")
+            self.__write_software(register, register.keys())
+
+    def upsert_software(self, register: Dict[str, Any], software_ids: Iterable[str]):
+        with self._lock, self._connection:
+            self.__write_software(register, software_ids)
+
+    def delete_software(self, register: Dict[str, Any], software_ids: Iterable[str]):
+        software_ids = list(software_ids)
+        with self._lock, self._connection:
+            for chunk in self.__chunks(software_ids):
+                for table in ("software", *self.CHILD_COLUMNS):
+                    column = "id" if table == "software" else "software_id"
+                    self._connection.execute(f"DELETE FROM {table} WHERE {column} IN ({', '.join('?' * len(chunk))})", chunk)
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
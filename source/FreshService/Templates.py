@@ -0,0 +1,72 @@
+import json
+import threading
+from os.path import exists, isfile
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional
+
+_local = threading.local()
+
+
+def freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value):
+    if isinstance(value, Mapping):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
+
+
+def render_markdown(message: str) -> str:
+    # Building a Markdown instance loads every extension, so each thread keeps one and resets it between documents
+    renderer = getattr(_local, "renderer", None)
+    if renderer is None:
+        import markdown
+
+        renderer = _local.renderer = markdown.Markdown()
+    return str(renderer.reset().convert(message))
+
+
+def read_message(message: str) -> str:
+    if exists(message) and isfile(message):
+        with open(message) as message_fh:
+            return message_fh.read().strip()
+    return message.strip()
+
+
+class TicketTemplates:
+    def __init__(self, templates: Dict[str, Any], defaults: Optional[Dict[str, Any]] = None):
+        self.raw = freeze(templates)
+        base = {**templates.get("DEFAULT", {}), **(defaults or {})}
+        compiled: Dict[str, Mapping[str, Any]] = {"DEFAULT": freeze(base)}
+        for name, template in templates.items():
+            if name != "DEFAULT":
+                compiled[name] = freeze({**base, **template})
+        self._compiled = MappingProxyType(compiled)
+
+    @classmethod
+    def load(cls, filepath: str, defaults: Optional[Dict[str, Any]] = None):
+        with open(filepath) as templates_fh:
+            return cls(json.load(templates_fh), defaults)
+
+    def __contains__(self, name: str):
+        return name in self._compiled
+
+    def __getitem__(self, name: str) -> Mapping[str, Any]:
+        return self._compiled[name]
+
+    def names(self) -> List[str]:
+        return list(self._compiled)
+
+    def render(self, template_name: str, description: str, subject: Optional[str] = None) -> Dict[str, Any]:
+        ticket_object: Dict[str, Any] = thaw(self._compiled[template_name])
+        if subject and subject.strip():
+            ticket_object["subject"] = subject.strip()
+        ticket_object["description"] = description
+        return ticket_object
@@ -0,0 +1,375 @@
+import argparse
+import contextlib
+import gc
+import json
+import logging
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+from time import perf_counter
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Optional
+
+from test.MockServer import MockFreshService, MockTenant
+
+resource: Optional[ModuleType]
+try:
+    import resource
+except ImportError:
+    resource = None
+
+SCALES = {"small": {"vendors": 5, "applications": 50, "installs": 10},
+          "medium": {"vendors": 20, "applications": 500, "installs": 20},
+          "large": {"vendors": 50, "applications": 2000, "installs": 50}}
+
+# The settings model requires these, the benchmark never reads a .env file
+BENCHMARK_ENVIRONMENT = {"FRESH_DOMAIN": "127.0.0.1",
+                         "FRESH_PROTOCOL": "http",
+                         "FRESH_KEY": "benchmark",
+                         "FRESH_TEMPLATE_FILEPATH": "./fresh_ticket_templates.json",
+                         "FRESH_PAGE_SIZE": "100",
+                         "FRESH_WORKSPACE_ID": "0",
+                         "FRESH_DEFAULT_CONTACT_EMAIL": "benchmark@example.com",
+                         "FRESH_DEFAULT_DEPT_ID": "0",
+                         "FRESH_DEFAULT_GROUP_ID": "0",
+                         "FRESH_DEFAULT_CATEGORY": "Benchmark",
+                         "FRESH_DEFAULT_SUBJECT": "Benchmark",
+                         "MAX_REQUEST_TIMEOUT": "5",
+                         "MAX_REQUEST_RETRIES": "5",
+                         "VERBOSE": "false"}
+
+COLD_START_BACKENDS = ("json", "sharded", "sqlite")
+# The tenant of the register memory comparison in the README
+REGISTER_TENANT = {"vendors": 50, "applications": 2000, "installs": 100, "machines": 5000, "users": 10}
+HEAVY_MODULES = ("bs4", "lxml", "markdown", "requests", "httpx", "sqlite3")
+
+# Both probes run in a fresh interpreter, so they pay for every import and cache read a one-off CLI invocation pays for
+IMPORT_PROBE = f"""
+import json, sys
+from time import perf_counter
+start = perf_counter()
+import FreshService.Client
+seconds = perf_counter() - start
+print(json.dumps({{"seconds": seconds, "modules": [name for name in {HEAVY_MODULES!r} if name in sys.modules]}}))
+"""
+
+LOOKUP_PROBE = """
+import contextlib, json, logging, os, sys
+from time import perf_counter
+start = perf_counter()
+logging.basicConfig(level=logging.WARNING, stream=sys.stderr)
+from FreshService.Client import FreshService
+config = json.loads(sys.argv[1])
+with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+    with FreshService(ENUM_CACHE=config["cache_paths"]) as client:
+        client.list_software(vendor_id_list=[config["vendor_id"]])
+        loaded = len(client.SoftwareRegister)
+print(json.dumps({"seconds": perf_counter() - start, "loaded": loaded}))
+"""
+
+
+def peak_rss_mib():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in KiB elsewhere
+    return round(peak / 1024 / (1024 if sys.platform == "darwin" else 1), 2)
+
+
+def measure(name: str, function: Callable[[], Any], items: int, server: MockFreshService, trace_memory: bool = False) -> Dict[str, Any]:
+    gc.collect()
+    requests = server.total_requests
+    if trace_memory:
+        tracemalloc.reset_peak()
+    start = perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        function()
+    elapsed = perf_counter() - start
+    result = {"operation": name,
+              "seconds": round(elapsed, 4),
+              "items": items,
+              "throughput": round(items / elapsed, 1) if elapsed else None,
+              "requests": server.total_requests - requests,
+              "peak_rss_mib": peak_rss_mib()}
+    if trace_memory:
+        result["peak_mib"] = round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 2)
+    return result
+
+
+def run_probe(script: str, environment: Dict[str, str], cwd: str, *argv: str) -> Dict[str, Any]:
+    process = subprocess.run([sys.executable, "-c", script, *argv], env=environment, cwd=cwd, capture_output=True, text=True)
+    if process.returncode:
+        raise RuntimeError(f"Cold start probe failed: {process.stderr.strip()}")
+    result: Dict[str, Any] = json.loads(process.stdout.strip().splitlines()[-1])
+    return result
+
+
+def probe_environment(**settings: str) -> Dict[str, str]:
+    source_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return {**os.environ, "PYTHONPATH": source_directory, **settings}
+
+
+def run_import_time(args) -> List[Dict[str, Any]]:
+    with tempfile.TemporaryDirectory() as workdir:
+        probes = [run_probe(IMPORT_PROBE, probe_environment(), workdir) for _ in range(args.cold_start_runs)]
+    return [{"scale": "-",
+             "operation": "import",
+             "seconds": round(statistics.median(probe["seconds"] for probe in probes), 4),
+             "heavy_modules": ",".join(probes[-1]["modules"]) or "-"}]
+
+
+def run_cold_start(scale: str, args) -> List[Dict[str, Any]]:
+    from FreshService.Client import FreshService
+    from FreshService.Config import Settings
+
+    tenant = MockTenant(seed=args.seed, **SCALES[scale])
+    stats = tenant.stats()
+    results = []
+    with MockFreshService(tenant, rate_limit=args.rate_limit, seed=args.seed) as server:
+        for backend in COLD_START_BACKENDS:
+            with tempfile.TemporaryDirectory() as workdir:
+                backend_settings = {"FRESH_DOMAIN": server.domain,
+                                    "FRESH_PAGE_SIZE": str(args.page_size),
+                                    "CACHE_BACKEND": backend,
+                                    "CACHE_DATABASE": os.path.join(workdir, "cache.sqlite"),
+                                    "EXPANSION_JOURNAL": os.path.join(workdir, "expansion.jsonl")}
+                cache_paths = {"VENDOR": os.path.join(workdir, "vendors.json"),
+                               "SOFTWARE": os.path.join(workdir, "software.json"),
+                               "ASSET": os.path.join(workdir, "assets.json")}
+                settings = Settings(**{**BENCHMARK_ENVIRONMENT, **backend_settings, "FRESH_PAGE_SIZE": args.page_size, "MAX_WORKERS": args.workers})
+                with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), \
+                        FreshService(settings=settings, ENUM_CACHE=cache_paths) as client:
+                    client.get_vendors(update_cache=True)
+                    client.get_software(update_cache=True)
+                    vendor_id = str(tenant.vendors[0]["id"])
+
+                requests = server.total_requests
+                config = json.dumps({"cache_paths": cache_paths, "vendor_id": vendor_id})
+                probes = [run_probe(LOOKUP_PROBE, probe_environment(**backend_settings), workdir, config)
+                          for _ in range(args.cold_start_runs)]
+                results.append({"scale": scale,
+                                "operation": f"cold_lookup_{backend}",
+                                "seconds": round(statistics.median(probe["seconds"] for probe in probes), 4),
+                                "items": probes[-1]["loaded"],
+                                "requests": server.total_requests - requests,
+                                **stats})
+    return results
+
+
+def html_corpus(documents: int, unique: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    models = ["Latitude 5440", "EliteBook 840 G9", "ThinkPad T14", "OptiPlex 7010", "MacBook Pro 14&quot;"]
+    specs = ["16GB RAM", "512GB SSD", "Win 11", "Dock &amp; charger"]
+    blocks = [lambda: f"<p>Model: <b>{rng.choice(models)}</b></p>",
+              lambda: f"<div>Serial&nbsp;number: SN{rng.randrange(10 ** 8):08d}<br></div>",
+              lambda: "<ul>\n" + "".join(f"<li>{rng.choice(specs)}</li>\n" for _ in range(rng.randint(1, 4))) + "</ul>",
+              lambda: "<table>\n<tr><th>Room</th><th>Desk</th></tr>\n" + f"<tr><td>{rng.randrange(500)}</td><td>{rng.randrange(40)}</td></tr>\n</table>",
+              lambda: f"<p>See <a href=\"https://kb.example.com/article?id={rng.randrange(999)}&amp;lang=en\">KB article</a> for caf&eacute; setup.</p>",
+              lambda: f"<p class=MsoNormal><span style='font-family:Calibri'>Owner: user{rng.randrange(999)}<o:p></o:p></span></p>\r\n",
+              lambda: f"<pre>  ipconfig /all\n  10.0.{rng.randrange(255)}.{rng.randrange(255)}</pre>"]
+    distinct = ["\n".join(rng.choice(blocks)() for _ in range(rng.randint(2, 8))) for _ in range(max(1, unique))]
+    # Machines built from one image share a description, so most documents repeat one seen earlier
+    return [distinct[i] if i < len(distinct) else rng.choice(distinct) for i in range(documents)]
+
+
+def run_html(args) -> List[Dict[str, Any]]:
+    from FreshService.HtmlText import HtmlTextConverter, builtin_to_text, bs4_available, bs4_to_text
+
+    corpus = html_corpus(args.html_documents, args.html_unique, args.seed)
+    expected = [bs4_to_text(document) for document in corpus] if bs4_available() else None
+    converter = HtmlTextConverter(max_size=args.html_unique)
+    paths = [("html_builtin", builtin_to_text), ("html_memoized", converter.convert)]
+    if expected is not None:
+        paths.insert(0, ("html_bs4", bs4_to_text))
+    results = []
+    for name, convert in paths:
+        gc.collect()
+        start = perf_counter()
+        texts = [convert(document) for document in corpus]
+        elapsed = perf_counter() - start
+        results.append({"scale": "-",
+                        "operation": name,
+                        "seconds": round(elapsed, 4),
+                        "items": len(corpus),
+                        "throughput": round(len(corpus) / elapsed, 1) if elapsed else None,
+                        "mismatches": "-" if expected is None else sum(text != want for text, want in zip(texts, expected))})
+    return results
+
+
+def register_cache(tenant: MockTenant) -> Dict[str, Any]:
+    from FreshService.HtmlText import builtin_to_text
+
+    # The software cache as the client writes it, with the installs expanded from the assets
+    assets = {machine_id: {"name": asset["name"],
+                           "description": builtin_to_text(asset["description"]) or None,
+                           "status": asset["type_fields"]["asset_state_11000765764"]}
+              for machine_id, asset in tenant.assets.items()}
+    return {str(application["id"]): {**application,
+                                     "fetched_at": 1700000000,
+                                     "installs": [{"path": install["installation_path"], "version": install["version"], "user": install["user_id"],
+                                                   **assets[install["installation_machine_id"]], "machine": install["installation_machine_id"]}
+                                                  for install in tenant.installations[application["id"]]],
+                                     "users": [{"user": user["user_id"], "license": user["license_id"], "state": user["state"], "last_use": user["last_used"]}
+                                               for user in tenant.users[application["id"]]],
+                                     "licenses": [{"license": item["id"], "contract_id": item["contract_id"]} for item in tenant.licenses[application["id"]]]}
+            for application in tenant.applications}
+
+
+def run_register_memory(args) -> List[Dict[str, Any]]:
+    from FreshService.Records import clear_pool, software_from_dict
+
+    def as_records(register: Dict[str, Any]) -> Dict[str, Any]:
+        for software in register.values():
+            software_from_dict(software)
+        return register
+
+    tenant = MockTenant(seed=args.seed, **REGISTER_TENANT)
+    stats = tenant.stats()
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        filepath = os.path.join(workdir, "software.json")
+        with open(filepath, "w") as json_fh:
+            json.dump(register_cache(tenant), json_fh)
+        del tenant
+        for name, convert in (("register_dicts", lambda register: register), ("register_records", as_records)):
+            clear_pool()
+            gc.collect()
+            tracing = tracemalloc.is_tracing()
+            if not tracing:
+                tracemalloc.start()
+            before = tracemalloc.get_traced_memory()[0]
+            with open(filepath) as json_fh:
+                register = convert(json.load(json_fh))
+            gc.collect()
+            # What the loaded register keeps, the pool included, not the peak while parsing
+            retained = tracemalloc.get_traced_memory()[0] - before
+            if not tracing:
+                tracemalloc.stop()
+            results.append({"scale": "-", "operation": name, "items": len(register), "memory_mib": round(retained / 1024 / 1024, 1), **stats})
+            del register
+    clear_pool()
+    return results
+
+
+def run_scale(scale: str, args) -> List[Dict[str, Any]]:
+    from FreshService.Client import FreshService
+    from FreshService.Config import Settings
+
+    tenant = MockTenant(seed=args.seed, **SCALES[scale])
+    stats = tenant.stats()
+    results = []
+    with MockFreshService(tenant, latency=args.latency, throttle_rate=args.throttle_rate, retry_after=args.retry_after,
+                          error_rate=args.error_rate, rate_limit=args.rate_limit, seed=args.seed) as server, tempfile.TemporaryDirectory() as workdir:
+        settings = Settings(**{**BENCHMARK_ENVIRONMENT,
+                               "FRESH_DOMAIN": server.domain,
+                               "FRESH_PAGE_SIZE": args.page_size,
+                               "MAX_WORKERS": args.workers,
+                               "ASYNC_EXPANSION": args.async_expansion,
+                               "CACHE_BACKEND": args.cache_backend,
+                               "CACHE_DATABASE": os.path.join(workdir, "cache.sqlite"),
+                               "EXPANSION_JOURNAL": os.path.join(workdir, "expansion.jsonl")})
+        cache_paths = {"VENDOR": os.path.join(workdir, "vendors.json"),
+                       "SOFTWARE": os.path.join(workdir, "software.json"),
+                       "ASSET": os.path.join(workdir, "assets.json")}
+        terms = [f"Application {i}" for i in range(0, stats["applications"], max(1, stats["applications"] // 50))] + ["studio", "zzz"]
+
+        with FreshService(settings=settings, ENUM_CACHE=cache_paths) as client:
+            client.asset_cache.clear()
+            results.append(measure("get_vendors", lambda: client.get_vendors(update_cache=True), stats["vendors"], server, args.memory))
+            results.append(measure("get_software", lambda: client.get_software(update_cache=True), stats["applications"], server, args.memory))
+            results.append(measure("expand_software", lambda: client.expand_software(), stats["applications"], server, args.memory))
+            results.append(measure("list_software", lambda: client.list_software(), stats["applications"], server, args.memory))
+            results.append(measure("filter_software", lambda: [client.filter_software([term]) for term in terms], len(terms), server, args.memory))
+            results.append(measure("cache_save", lambda: (client.cache_backend.save_vendors(client.VendorRegister),
+                                                          client.cache_backend.save_software(client.SoftwareRegister),
+                                                          client.asset_cache.save(cache_paths["ASSET"])),
+                                   stats["applications"], server, args.memory))
+
+        def load_cache():
+            with FreshService(settings=settings, ENUM_CACHE=cache_paths) as cached_client:
+                cached_client.get_vendors()
+                cached_client.get_software()
+
+        results.append(measure("cache_load", load_cache, stats["applications"], server, args.memory))
+        for result in results:
+            result.update({"scale": scale, **stats})
+        if args.verbose:
+            print(f"{scale}: {dict(server.responses)} {dict(server.requests)}", file=sys.stderr)
+    return results
+
+
+def print_table(results: List[Dict[str, Any]]):
+    columns = ["scale", "operation", "seconds", "items", "throughput", "requests", "peak_rss_mib", "peak_mib", "memory_mib", "heavy_modules", "mismatches"]
+    columns = [column for column in columns if any(column in result for result in results)]
+    widths = {column: max(len(column), *(len(str(result.get(column, ""))) for result in results)) for column in columns}
+    print("  ".join(column.ljust(widths[column]) for column in columns))
+    print("  ".join("-" * widths[column] for column in columns))
+    for result in results:
+        print("  ".join(str(result.get(column, "")).ljust(widths[column]) for column in columns))
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark the FreshService client against a local mock tenant")
+    parser.add_argument("--scales", default="small,medium", help=f"Comma separated scales: {', '.join(SCALES)}")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds of latency added to every response")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of requests answered with HTTP-429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with HTTP-429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with HTTP-503")
+    parser.add_argument("--rate-limit", type=int, help="Per-minute budget announced in X-RateLimit headers, unlimited when omitted")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--async-expansion", action="store_true")
+    parser.add_argument("--cache-backend", default="json", choices=("json", "sharded", "sqlite"))
+    parser.add_argument("--trace-memory", dest="memory", action="store_true",
+                        help="Report the tracemalloc peak per operation, which slows down every operation several times")
+    parser.add_argument("--cold-start", action="store_true",
+                        help="Also time the import and a one vendor lookup from a warm cache in fresh interpreters, per cache backend")
+    parser.add_argument("--cold-start-runs", type=int, default=5, help="Fresh interpreters per cold start measurement, the median is reported")
+    parser.add_argument("--html", action="store_true",
+                        help="Also compare the builtin and BeautifulSoup description parsers, and the memoized converter, on generated descriptions")
+    parser.add_argument("--html-documents", type=int, default=5000, help="Descriptions converted per HTML parser")
+    parser.add_argument("--html-unique", type=int, default=500, help="Distinct descriptions among them, the rest repeat")
+    parser.add_argument("--register-memory", action="store_true",
+                        help="Also compare the memory of a large software register loaded from the JSON cache as dicts and as records")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", help="Write the results as JSON to this path")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    for key, value in BENCHMARK_ENVIRONMENT.items():
+        os.environ.setdefault(key, value)
+    # Configuring the root logger keeps the client from installing its own stdout handler
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING, stream=sys.stderr)
+
+    scales = [scale.strip() for scale in args.scales.split(",") if scale.strip()]
+    unknown = [scale for scale in scales if scale not in SCALES]
+    if unknown:
+        parser.error(f"Unknown scales: {', '.join(unknown)}")
+
+    if args.memory:
+        tracemalloc.start()
+    results = run_import_time(args) if args.cold_start else []
+    if args.html:
+        results.extend(run_html(args))
+    if args.register_memory:
+        results.extend(run_register_memory(args))
+    for scale in scales:
+        results.extend(run_scale(scale, args))
+        if args.cold_start:
+            results.extend(run_cold_start(scale, args))
+    if args.memory:
+        tracemalloc.stop()
+
+    print_table(results)
+    if args.json_path:
+        with open(args.json_path, "w") as json_fh:
+            json.dump(results, json_fh, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+
+class MockTenant:
+    def __init__(self, vendors: int = 10, applications: int = 100, installs: int = 20, machines: Optional[int] = None,
+                 users: int = 2, licenses: int = 1, seed: int = 0):
+        rng = random.Random(seed)
+        # Installs are spread over fewer machines than installs, as real fleets share machines between applications
+        machines = machines or max(1, applications * installs // 10)
+        self.vendors: List[Dict[str, Any]]
+        self.vendors = [{"id": 1 + i, "name": f"Vendor {i}"} for i in range(vendors)]
+        self.applications: List[Dict[str, Any]]
+        self.applications = [{"id": 10000 + i,
+                              "name": f"Application {i} {rng.choice(('Studio', 'Agent', 'Runtime', 'Viewer', 'Tools'))}",
+                              # Every eleventh application has no known publisher
+                              "publisher_id": self.vendors[i % vendors]["id"] if vendors and i % 11 else None,
+                              "category": rng.choice(("Productivity", "Security", "Development")),
+                              "status": rng.choice(("managed", "ignored", "restricted")),
+                              "updated_at": "2024-01-01T00:00:00Z"}
+                             for i in range(applications)]
+        self.assets: Dict[int, Dict[str, Any]]
+        self.assets = {100000 + i: {"id": 100000 + i,
+                                    "display_id": 100000 + i,
+                                    "name": f"host-{i:06d}",
+                                    "description": f"<p>Workstation {i}</p>\n<p>Floor {i % 7} &amp; desk {i % 40}</p>" if i % 5 else "",
+                                    "type_fields": {"asset_state_11000765764": "Retired" if i % 9 == 0 else "In Use"},
+                                    "updated_at": "2024-01-01T00:00:00Z"}
+                       for i in range(machines)}
+        machine_ids = list(self.assets)
+        self.installations: Dict[int, List[Dict[str, Any]]]
+        self.installations = {application["id"]: [{"installation_path": f"C:\\Program Files\\Application {application['id']}",
+                                                   "version": f"{1 + k % 3}.{k % 5}",
+                                                   "user_id": 500 + rng.randrange(1000),
+                                                   "installation_machine_id": rng.choice(machine_ids)}
+                                                  for k in range(installs)]
+                              for application in self.applications}
+        self.users: Dict[int, List[Dict[str, Any]]]
+        self.users = {application["id"]: [{"user_id": 500 + k, "license_id": None, "state": "active", "last_used": "2024-01-01T00:00:00Z"}
+                                          for k in range(users)]
+                      for application in self.applications}
+        self.licenses: Dict[int, List[Dict[str, Any]]]
+        self.licenses = {application["id"]: [{"id": 900 + k, "contract_id": 50 + k} for k in range(licenses)]
+                         for application in self.applications}
+
+    def stats(self) -> Dict[str, int]:
+        return {"vendors": len(self.vendors),
+                "applications": len(self.applications),
+                "installs": sum(len(installs) for installs in self.installations.values()),
+                "machines": len(self.assets)}
+
+
+class MockFreshService:
+    HOST = "127.0.0.1"
+    ROUTES = [(re.compile(r"^/api/v2/vendors$"), "vendors"),
+              (re.compile(r"^/api/v2/applications$"), "applications"),
+              (re.compile(r"^/api/v2/applications/(\d+)/(users|licenses|installations)$"), "sub_resource"),
+              (re.compile(r"^/api/v2/applications/(\d+)$"), "application"),
+              (re.compile(r"^/api/v2/assets$"), "assets"),
+              (re.compile(r"^/api/v2/assets/(\d+)$"), "asset"),
+              (re.compile(r"^/api/v2/tickets$"), "tickets")]
+    UPDATED_SINCE = re.compile(r"updated_at:>'([^']+)'")
+    SUB_RESOURCES = {"users": ("users", "application_users"),
+                     "licenses": ("licenses", "licenses"),
+                     "installations": ("installations", "installations")}
+
+    def __init__(self, tenant: MockTenant, latency: float = 0.0, throttle_rate: float = 0.0, retry_after: int = 1,
+                 error_rate: float = 0.0, rate_limit: Optional[int] = None, seed: int = 0):
+        self.tenant = tenant
+        self.rate_limit = rate_limit
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.error_rate = error_rate
+        self.requests: Counter[str] = Counter()
+        self.responses: Counter[int] = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self.tickets: List[Dict[str, Any]] = []
+        self._window = (0, 0)
+
+    @property
+    def domain(self) -> str:
+        if self._server is None:
+            raise RuntimeError("The mock server is not running")
+        return f"{self.HOST}:{self._server.server_port}"
+
+    @property
+    def total_requests(self) -> int:
+        with self._lock:
+            return sum(self.requests.values())
+
+    def reset_counters(self):
+        with self._lock:
+            self.requests.clear()
+            self.responses.clear()
+
+    def start(self):
+        self._server = ThreadingHTTPServer((self.HOST, 0), self.__handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="MockFreshService", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def rate_limit_headers(self) -> Dict[str, str]:
+        # FreshService reports its per-minute budget, which the client's rate limiter adopts
+        if self.rate_limit is None:
+            return {}
+        minute = int(time.time() // 60)
+        with self._lock:
+            window, used = self._window
+            used = used + 1 if window == minute else 1
+            self._window = (minute, used)
+        return {"X-RateLimit-Total": str(self.rate_limit), "X-RateLimit-Remaining": str(max(0, self.rate_limit - used))}
+
+    def _inject(self) -> Optional[int]:
+        with self._lock:
+            roll = self._random.random()
+        if roll < self.throttle_rate:
+            return 429
+        if roll < self.throttle_rate + self.error_rate:
+            return 503
+        return None
+
+    def __page(self, items: List[Dict[str, Any]], query: Dict[str, List[str]], path: str):
+        per_page = int(query.get("per_page", ["30"])[0])
+        page = int(query.get("page", ["1"])[0])
+        headers = {}
+        if page * per_page < len(items):
+            headers["Link"] = f'<{path}?page={page + 1}&per_page={per_page}>; rel="next"'
+        return items[(page - 1) * per_page:page * per_page], headers
+
+    def match(self, path: str):
+        for pattern, name in self.ROUTES:
+            match = pattern.match(path)
+            if match:
+                if name == "sub_resource":
+                    return f"application_{match.group(2)}", match
+                return name, match
+        return "unknown", None
+
+    def route(self, method: str, path: str, query: Dict[str, List[str]], body: Optional[Dict[str, Any]]):
+        name, match = self.match(path)
+        if match is None:
+            return 404, {}, {}
+        tenant = self.tenant
+        if method == "GET" and name == "vendors":
+            items, headers = self.__page(tenant.vendors, query, path)
+            return 200, {"vendors": items}, headers
+        if method == "GET" and name == "applications":
+            items, headers = self.__page(tenant.applications, query, path)
+            return 200, {"applications": items}, headers
+        if method == "GET" and name.startswith("application_"):
+            attribute, field = self.SUB_RESOURCES[match.group(2)]
+            items, headers = self.__page(getattr(tenant, attribute).get(int(match.group(1)), []), query, path)
+            return 200, {field: items}, headers
+        if method == "GET" and name == "assets":
+            assets = list(tenant.assets.values())
+            # Only the updated_at lower bound the client uses for incremental refreshes is understood
+            updated_since = self.UPDATED_SINCE.search(query.get("filter", [""])[0])
+            if updated_since:
+                assets = [asset for asset in assets if asset["updated_at"] > updated_since.group(1)]
+            items, headers = self.__page(assets, query, path)
+            return 200, {"assets": items}, headers
+        if method == "GET" and name == "asset":
+            asset = tenant.assets.get(int(match.group(1)))
+            return (200 if asset else 404), ({"asset": asset} if asset else {}), {}
+        if method == "DELETE" and name == "application":
+            application_id = int(match.group(1))
+            with self._lock:
+                tenant.applications = [application for application in tenant.applications if application["id"] != application_id]
+            return 204, None, {}
+        if method == "POST" and name == "tickets":
+            with self._lock:
+                self.tickets.append(body or {})
+                ticket_id = len(self.tickets)
+            return 201, {"ticket": {"id": ticket_id, "subject": (body or {}).get("subject")}}, {}
+        return 405, {}, {}
+
+    def __handler(self):
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are separate writes, Nagle would hold the body back for a delayed ACK
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def __respond(self, status: int, body, headers: Dict[str, str]):
+                data = json.dumps(body).encode() if body is not None else b""
+                with service._lock:
+                    service.responses[status] += 1
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in {**service.rate_limit_headers(), **headers}.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def __handle(self, method: str):
+                url = urlparse(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+                if service.latency:
+                    time.sleep(service.latency)
+                path = url.path.rstrip("/")
+                endpoint, _ = service.match(path)
+                with service._lock:
+                    service.requests[f"{method} {endpoint}"] += 1
+                # Injected failures are decided before routing, so a rejected request never changes the tenant
+                injected = service._inject()
+                if injected == 429:
+                    return self.__respond(429, {"message": "Rate limited"}, {"Retry-After": str(service.retry_after)})
+                if injected:
+                    return self.__respond(injected, {"message": "Service unavailable"}, {})
+                self.__respond(*service.route(method, path, parse_qs(url.query), body))
+
+            def do_GET(self):
+                self.__handle("GET")
+
+            def do_POST(self):
+                self.__handle("POST")
+
+            def do_DELETE(self):
+                self.__handle("DELETE")
+
+        return Handler
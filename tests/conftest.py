@@ -0,0 +1,78 @@
+import contextlib
+import os
+
+import pytest
+
+from FreshService.Client import FreshService
+from FreshService.Config import Settings
+from FreshService.Storage import JsonCacheBackend, ShardedJsonCacheBackend, SqliteCacheBackend
+from test.MockServer import MockFreshService, MockTenant
+
+BACKENDS = ("json", "sharded", "sqlite")
+
+
+class FailingFreshService(MockFreshService):
+    # Answers one page of a listing with a server error, e.g. ("applications", 2)
+    fail = None
+
+    def route(self, method, path, query, body):
+        name, _ = self.match(path)
+        if (name, int(query.get("page", ["1"])[0])) == self.fail:
+            return 503, {}, {}
+        return super().route(method, path, query, body)
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    # Keeps the default cache paths and any .env of the checkout out of the tests
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request, tmp_path):
+    if request.param == "json":
+        cache = JsonCacheBackend(str(tmp_path / "vendors.json"), str(tmp_path / "software.json"), flush_interval=0)
+    elif request.param == "sharded":
+        cache = ShardedJsonCacheBackend(str(tmp_path / "vendors.json"), str(tmp_path / "software"), flush_interval=0)
+    else:
+        cache = SqliteCacheBackend(str(tmp_path / "cache.sqlite"))
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def server():
+    tenant = MockTenant(vendors=3, applications=24, installs=2, seed=0)
+    with FailingFreshService(tenant) as service:
+        yield service
+
+
+@pytest.fixture
+def make_client(server, tmp_path):
+    @contextlib.contextmanager
+    def make_client(**overrides):
+        values = {"FRESH_DOMAIN": server.domain,
+                  "FRESH_PROTOCOL": "http",
+                  "FRESH_KEY": "test",
+                  "FRESH_TEMPLATE_FILEPATH": str(tmp_path / "templates.json"),
+                  "FRESH_PAGE_SIZE": 10,
+                  "FRESH_WORKSPACE_ID": 0,
+                  "FRESH_DEFAULT_CONTACT_EMAIL": "test@example.com",
+                  "FRESH_DEFAULT_DEPT_ID": 0,
+                  "FRESH_DEFAULT_GROUP_ID": 0,
+                  "FRESH_DEFAULT_CATEGORY": "Test",
+                  "FRESH_DEFAULT_SUBJECT": "Test",
+                  "MAX_REQUEST_TIMEOUT": 5,
+                  "MAX_REQUEST_RETRIES": 1,
+                  "CACHE_DATABASE": str(tmp_path / "cache.sqlite"),
+                  "EXPANSION_JOURNAL": "",
+                  "EXPANSION_RETRIES": 0,
+                  "VERBOSE": False,
+                  **overrides}
+        paths = {"VENDOR": str(tmp_path / "vendors.json"), "SOFTWARE": str(tmp_path / "software.json"), "ASSET": str(tmp_path / "assets.json")}
+        # The client prints its progress, which is of no use in the test output
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            with FreshService(settings=Settings(**values), ENUM_CACHE=paths) as client:
+                yield client
+    return make_client
@@ -0,0 +1,137 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from time import monotonic, sleep
+
+import pytest
+
+import FreshService.AssetCache
+from FreshService.AssetCache import AssetCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1700000000.0]
+    monkeypatch.setattr(FreshService.AssetCache, "time", lambda: now[0])
+    return now
+
+
+def test_get_or_fetch_coalesces_threads():
+    cache = AssetCache()
+    calls = []
+    release = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return {"name": "host"}
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [executor.submit(cache.get_or_fetch, 100, fetch) for _ in range(8)]
+        deadline = monotonic() + 5
+        while cache.stats()["coalesced"] < 7 and monotonic() < deadline:
+            sleep(0.001)
+        release.set()
+        assert [future.result() for future in futures] == [{"name": "host"}] * 8
+    assert len(calls) == 1
+    assert cache.stats() == {"size": 1, "hits": 0, "misses": 1, "coalesced": 7, "evictions": 0}
+    assert cache.get_or_fetch(100, fetch) == {"name": "host"}
+    assert cache.stats()["hits"] == 1
+
+
+def test_get_or_fetch_async_coalesces_coroutines():
+    cache = AssetCache()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"name": "host"}
+
+    async def run():
+        return await asyncio.gather(*[cache.get_or_fetch_async(100, fetch) for _ in range(8)])
+
+    assert asyncio.run(run()) == [{"name": "host"}] * 8
+    assert len(calls) == 1
+    assert cache.stats()["coalesced"] == 7
+
+
+def test_failed_lookup_is_shared_and_retried():
+    cache = AssetCache()
+
+    def fail():
+        raise ConnectionError("unreachable")
+
+    with pytest.raises(ConnectionError):
+        cache.get_or_fetch(100, fail)
+    assert 100 not in cache
+    # Empty results reach the caller but are not kept
+    assert cache.get_or_fetch(100, dict) == {}
+    assert cache.get_or_fetch(100, lambda: {"name": "host"}) == {"name": "host"}
+
+
+def test_ttl(clock):
+    cache = AssetCache(ttl=60)
+    cache.put(100, {"name": "host"})
+    clock[0] += 60
+    assert cache.get(100) == {"name": "host"}
+    clock[0] += 1
+    assert cache.get(100) is None
+    assert 100 not in cache
+
+
+def test_lru_eviction():
+    cache = AssetCache(max_size=2)
+    cache.put(1, "a")
+    cache.put(2, "b")
+    assert cache.get(1) == "a"
+    cache.put(3, "c")
+    assert cache.get(2) is None
+    assert (cache.get(1), cache.get(3)) == ("a", "c")
+    assert cache.stats()["evictions"] == 1
+
+
+def test_save_and_load(tmp_path, clock):
+    filepath = str(tmp_path / "assets.json")
+    cache = AssetCache(ttl=60)
+    cache.put(1, {"name": "old"})
+    clock[0] += 30
+    cache.put(2, {"name": "new", "status": None})
+    cache.save(filepath)
+
+    loaded = AssetCache(ttl=60)
+    assert loaded.load(filepath) == 2
+    assert (loaded.get(1), loaded.get(2)) == ({"name": "old"}, {"name": "new", "status": None})
+    # Entries keep the time they were fetched, not the time they were loaded
+    clock[0] += 31
+    expired = AssetCache(ttl=60)
+    assert expired.load(filepath) == 1
+    assert expired.get(1) is None
+
+
+def test_load_keeps_the_most_recent_entries(tmp_path, clock):
+    filepath = str(tmp_path / "assets.json")
+    cache = AssetCache()
+    for key in range(3):
+        cache.put(key, key)
+        clock[0] += 1
+    cache.save(filepath)
+    loaded = AssetCache(max_size=2)
+    loaded.load(filepath)
+    assert (loaded.get(0), loaded.get(1), loaded.get(2)) == (None, 1, 2)
+
+
+def test_shared_per_domain():
+    cache = AssetCache.shared("tenant-a.freshservice.com", max_size=10)
+    assert AssetCache.shared("tenant-a.freshservice.com", max_size=10) is cache
+    assert AssetCache.shared("tenant-b.freshservice.com") is not cache
+    for key in range(10):
+        cache.put(key, key)
+    assert AssetCache.shared("tenant-a.freshservice.com", max_size=4, ttl=60) is cache
+    assert (len(cache), cache.ttl) == (4, 60)
+
+
+def test_clients_of_different_tenants_do_not_share_assets(make_client):
+    with make_client() as client, make_client(FRESH_DOMAIN="127.0.0.1:1") as other:
+        assert client.asset_cache is client.asset_cache
+        assert client.asset_cache is not other.asset_cache
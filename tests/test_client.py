@@ -0,0 +1,157 @@
+import threading
+from datetime import datetime, timezone
+from time import time
+
+import pytest
+
+from conftest import BACKENDS
+
+
+def installs(register):
+    return {software_id: len(software["installs"]) for software_id, software in register.items()}
+
+
+def populate(make_client, backend):
+    with make_client(CACHE_BACKEND=backend) as client:
+        client.get_vendors(update_cache=True)
+        client.get_software(update_cache=True)
+        return installs(client.SoftwareRegister)
+
+
+def reload(make_client, backend):
+    with make_client(CACHE_BACKEND=backend) as client:
+        client.get_vendors()
+        client.get_software()
+        return installs(client.SoftwareRegister)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_refresh_software(make_client, server, backend):
+    cached = populate(make_client, backend)
+    deleted = {str(application["id"]) for application in server.tenant.applications[:3]}
+    server.tenant.applications = server.tenant.applications[3:]
+    modified = server.tenant.applications[0]
+    modified["updated_at"] = "2024-06-01T00:00:00Z"
+    server.tenant.installations[modified["id"]] = server.tenant.installations[modified["id"]][:1]
+
+    with make_client(CACHE_BACKEND=backend) as client:
+        client.get_vendors()
+        client.get_software()
+        assert client.refresh_software() == [str(modified["id"])]
+        assert not deleted & client.SoftwareRegister.keys()
+
+    expected = {software_id: count for software_id, count in cached.items() if software_id not in deleted}
+    expected[str(modified["id"])] = 1
+    assert reload(make_client, backend) == expected
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_refresh_software_aborts_on_failed_page(make_client, server, backend):
+    cached = populate(make_client, backend)
+    server.fail = ("applications", 2)
+    with make_client(CACHE_BACKEND=backend) as client:
+        client.get_vendors()
+        client.get_software()
+        assert client.refresh_software() == []
+        assert installs(client.SoftwareRegister) == cached
+    server.fail = None
+    assert reload(make_client, backend) == cached
+
+
+def rename_asset(server, updated_at):
+    machine_id = server.tenant.installations[server.tenant.applications[1]["id"]][0]["installation_machine_id"]
+    updated_at = datetime.fromtimestamp(updated_at, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    server.tenant.assets[machine_id].update({"name": "renamed", "updated_at": updated_at})
+    return machine_id
+
+
+def machine_names(register, machine_id):
+    return {install["name"] for software in register.values() for install in software["installs"] if install["machine"] == machine_id}
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_refresh_software_patches_assets_updated_during_crawl(make_client, server, backend):
+    started = time()
+    populate(make_client, backend)
+    # Changed while the crawl was running, after the installs of this machine were expanded
+    machine_id = rename_asset(server, started - 1)
+    with make_client(CACHE_BACKEND=backend) as client:
+        client.get_vendors()
+        client.get_software()
+        assert client.refresh_software() == []
+        assert machine_names(client.SoftwareRegister, machine_id) == {"renamed"}
+    with make_client(CACHE_BACKEND=backend) as client:
+        client.get_vendors()
+        client.get_software()
+        assert machine_names(client.SoftwareRegister, machine_id) == {"renamed"}
+
+
+def test_refresh_software_retries_assets_after_failed_page(make_client, server):
+    populate(make_client, "sqlite")
+    machine_id = rename_asset(server, time())
+    server.fail = ("assets", 1)
+    with make_client(CACHE_BACKEND="sqlite") as client:
+        client.get_vendors()
+        client.get_software()
+        client.refresh_software()
+        assert machine_names(client.SoftwareRegister, machine_id) != {"renamed"}
+    server.fail = None
+    with make_client(CACHE_BACKEND="sqlite") as client:
+        client.get_vendors()
+        client.get_software()
+        client.refresh_software()
+        assert machine_names(client.SoftwareRegister, machine_id) == {"renamed"}
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_partial_load_keeps_cache(make_client, backend):
+    cached = populate(make_client, backend)
+    with make_client(CACHE_BACKEND=backend) as client:
+        client.get_vendors()
+        client.get_software(vendor_id_list=["999"])
+    assert reload(make_client, backend) == cached
+
+
+def test_wipe_software(make_client, server):
+    unused = [application["id"] for application in server.tenant.applications[::4]]
+    for application_id in unused:
+        server.tenant.installations[application_id] = []
+        server.tenant.users[application_id] = []
+        server.tenant.licenses[application_id] = []
+    with make_client() as client:
+        client.get_vendors(update_cache=True)
+        client.get_software(update_cache=True)
+        # Without fetched_at the empty relations may never have been fetched
+        client.SoftwareRegister[str(unused[0])].pop("fetched_at")
+
+        summary = client.wipe_software(dry_run=True)
+        assert sorted(summary["would_delete"]) == sorted(str(application_id) for application_id in unused[1:])
+        assert summary["deleted"] == []
+        assert len(server.tenant.applications) == 24
+
+        summary = client.wipe_software()
+        assert sorted(summary["deleted"]) == sorted(str(application_id) for application_id in unused[1:])
+        assert str(unused[0]) in summary["skipped"]
+        assert summary["failed"] == []
+        assert not set(summary["deleted"]) & client.SoftwareRegister.keys()
+    assert {application["id"] for application in server.tenant.applications} & set(unused) == {unused[0]}
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_async_expansion_writes_off_the_event_loop(make_client, backend, monkeypatch):
+    cached = populate(make_client, backend)
+    with make_client(CACHE_BACKEND=backend, ASYNC_EXPANSION=True) as client:
+        client.get_vendors()
+        client.get_software()
+        writers = []
+        upsert_software = client.cache_backend.upsert_software
+
+        def record_writer(register, software_ids):
+            writers.append(threading.current_thread())
+            upsert_software(register, software_ids)
+
+        monkeypatch.setattr(client.cache_backend, "upsert_software", record_writer)
+        client.expand_software()
+        assert len(writers) == len(cached)
+        assert threading.main_thread() not in writers
+    assert reload(make_client, backend) == cached
@@ -0,0 +1,64 @@
+import pytest
+
+from FreshService.HtmlText import HtmlTextConverter, builtin_to_text
+from test.Benchmark import html_corpus
+
+DOCUMENTS = [
+    "",
+    "plain text",
+    "  \n  <p>leading whitespace</p>",
+    "<p>Model: <b>Latitude 5440</b></p>\n<p>Floor 3 &amp; desk 12</p>",
+    "<div>Serial&nbsp;number: SN00001234<br></div>",
+    "<ul>\n<li>16GB RAM</li>\n<li>512GB SSD\n</ul>",
+    "<p>one<p>two<div>three</div>",
+    "<table>\n<tr><th>Room</th><td>12</td></tr>\n<tr><td>3<td>4</table>",
+    "<b>bold</i> still bold</b>",
+    "<table><tr><td><div>cell</td></div>after</table>",
+    "<pre>  ipconfig /all\n  10.0.0.1</pre>\n<p>  collapsed \n text  </p>",
+    "<style>p {}</style><meta charset=utf-8>text in head<p>body</p>",
+    "<script>var a = '<p>';</script>visible",
+    "<p class=MsoNormal><span style='font-family:Calibri'>Owner<o:p></o:p></span></p>\r\n",
+    "text<!-- comment -->more<!DOCTYPE html>end",
+    "caf&eacute; &lt;tag&gt; &#x41;&#66;",
+    "<p>unterminated <b",
+    "<p>unterminated comment <!-- never closed",
+    "a\rb\r\nc\x00d",
+]
+
+
+@pytest.fixture(scope="module")
+def bs4_to_text():
+    pytest.importorskip("bs4")
+    pytest.importorskip("lxml")
+    from FreshService.HtmlText import bs4_to_text
+
+    return bs4_to_text
+
+
+@pytest.mark.parametrize("html", DOCUMENTS)
+def test_builtin_matches_bs4(bs4_to_text, html):
+    assert builtin_to_text(html) == bs4_to_text(html)
+
+
+def test_builtin_matches_bs4_on_generated_descriptions(bs4_to_text):
+    for html in html_corpus(500, 500, seed=0):
+        assert builtin_to_text(html) == bs4_to_text(html)
+
+
+@pytest.mark.parametrize("html", ["<html><body><p>document</p></body></html>", "<textarea><b>raw</b></textarea>", "<![CDATA[x]]>y"])
+def test_unsupported_markup_falls_back_to_bs4(bs4_to_text, html):
+    converter = HtmlTextConverter()
+    assert converter.convert(html) == bs4_to_text(html)
+    assert converter.stats()["fallbacks"] == 1
+
+
+def test_converter_memoizes():
+    converter = HtmlTextConverter(max_size=2)
+    for html in ("<p>a</p>", "<p>b</p>", "<p>a</p>", "<p>c</p>", "<p>b</p>"):
+        assert converter.convert(html) == builtin_to_text(html)
+    assert converter.stats() == {"size": 2, "hits": 1, "misses": 4, "fallbacks": 0, "evictions": 2}
+
+
+def test_unknown_parser():
+    with pytest.raises(ValueError):
+        HtmlTextConverter(parser="html5lib")
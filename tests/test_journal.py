@@ -0,0 +1,78 @@
+import json
+import os
+import time
+
+from FreshService.Journal import ExpansionJournal
+from FreshService.Records import InstallRecord, software_from_dict
+
+
+def make_software(installs=1):
+    return {"installs": [InstallRecord("C:\\App", "1.0", 500, "host", "Workstation", "In Use", 100000 + i) for i in range(installs)],
+            "users": [], "licenses": []}
+
+
+def test_load_completed(tmp_path):
+    journal = ExpansionJournal(str(tmp_path / "journal.jsonl"))
+    journal.completed("10", make_software(installs=2))
+    journal.failed("11", {"installs": "timed out"})
+    journal.completed("12", make_software())
+    journal.close()
+
+    checkpoints = ExpansionJournal(journal.filepath).load()
+    assert set(checkpoints) == {"10", "12"}
+    assert software_from_dict(checkpoints["10"])["installs"] == make_software(installs=2)["installs"]
+
+
+def test_load_skips_expired_and_malformed_entries(tmp_path):
+    filepath = tmp_path / "journal.jsonl"
+    with open(filepath, "w") as journal_fh:
+        journal_fh.write(json.dumps({"software_id": "10", "status": "completed", "at": time.time() - 7200, "installs": [], "users": [], "licenses": []}))
+        journal_fh.write("\n{\"software_id\": \"11\", \"sta")
+    journal = ExpansionJournal(str(filepath), max_age=3600)
+    journal.completed("12", make_software())
+    journal.close()
+    assert set(journal.load()) == {"12"}
+
+
+def test_load_without_journal(tmp_path):
+    assert ExpansionJournal(str(tmp_path / "journal.jsonl")).load() == {}
+    assert ExpansionJournal(str(tmp_path / "journal.jsonl"), max_age=0).load() == {}
+
+
+def test_clear_keeps_other_applications(tmp_path):
+    journal = ExpansionJournal(str(tmp_path / "journal.jsonl"))
+    for software_id in ("10", "11", "12"):
+        journal.completed(software_id, make_software())
+    journal.clear(["10", "12"])
+    assert set(journal.load()) == {"11"}
+    journal.clear(["11"])
+    assert not os.path.exists(journal.filepath)
+
+
+def test_clear_all(tmp_path):
+    journal = ExpansionJournal(str(tmp_path / "journal.jsonl"))
+    journal.completed("10", make_software())
+    journal.clear()
+    assert not os.path.exists(journal.filepath)
+    journal.clear()
+
+
+def test_resume_expansion(make_client, tmp_path):
+    journal_filepath = str(tmp_path / "journal.jsonl")
+    with make_client() as client:
+        client.get_vendors(update_cache=True)
+        client.get_software(update_cache=True)
+        software_id = next(iter(client.SoftwareRegister))
+        expanded = client.SoftwareRegister[software_id]
+    assert len(expanded["installs"]) == 2
+
+    # An interrupted run leaves the checkpoint of an application that is not yet in the cache
+    journal = ExpansionJournal(journal_filepath)
+    journal.completed(software_id, {**expanded, "installs": expanded["installs"][:1]})
+    journal.close()
+    with make_client(EXPANSION_JOURNAL=journal_filepath) as client:
+        client.get_vendors()
+        client.get_software()
+        client.expand_software(software_id_list=list(client.SoftwareRegister))
+        assert client.SoftwareRegister[software_id]["installs"] == expanded["installs"][:1]
+    assert not os.path.exists(journal_filepath)
@@ -0,0 +1,78 @@
+from email.utils import formatdate
+from time import time
+
+import pytest
+
+from FreshService.RateLimiter import RateLimiter
+
+
+def test_retry_after_seconds():
+    limiter = RateLimiter()
+    assert limiter.retry_after({"retry-after": "7"}, attempt=1) == 7
+    assert limiter.retry_after({"retry-after": "-3"}, attempt=1) == 0
+
+
+def test_retry_after_http_date():
+    limiter = RateLimiter()
+    assert 25 <= limiter.retry_after({"retry-after": formatdate(time() + 30, usegmt=True)}, attempt=1) <= 30
+    assert limiter.retry_after({"retry-after": formatdate(time() - 30, usegmt=True)}, attempt=1) == 0
+
+
+@pytest.mark.parametrize("headers", [{}, {"retry-after": ""}, {"retry-after": "soon"}])
+def test_retry_after_falls_back_to_backoff(headers):
+    limiter = RateLimiter(backoff_base=2, backoff_max=10)
+    assert 1 <= limiter.retry_after(headers, attempt=1) <= 2
+    assert 4 <= limiter.retry_after(headers, attempt=3) <= 8
+    assert 5 <= limiter.retry_after(headers, attempt=10) <= 10
+
+
+def test_pause():
+    limiter = RateLimiter()
+    assert limiter.paused_for() == 0
+    assert limiter.reserve() == 0
+    limiter.pause(30)
+    assert 29 < limiter.paused_for() <= 30
+    assert 29 < limiter.reserve() <= 30
+    # A shorter pause never cuts an earlier one short
+    limiter.pause(5)
+    assert limiter.paused_for() > 29
+    assert limiter.throttled == 2
+
+
+def test_pause_drains_tokens():
+    limiter = RateLimiter(rate_per_minute=600)
+    assert limiter.reserve() == 0
+    limiter.pause(0)
+    assert limiter.reserve() > 0
+
+
+def test_reserve_spends_burst():
+    limiter = RateLimiter(rate_per_minute=60, burst=3)
+    assert [limiter.reserve() for _ in range(3)] == [0, 0, 0]
+    assert 0.9 < limiter.reserve() <= 1
+
+
+def test_update_adopts_api_limit():
+    limiter = RateLimiter(rate_per_minute=600)
+    limiter.update({"X-RateLimit-Total": "120", "X-RateLimit-Remaining": "0"})
+    assert limiter.stats()["rate_per_minute"] == 120
+    assert limiter.stats()["limit_remaining"] == 0
+    assert limiter.reserve() > 0
+
+
+def test_update_keeps_configured_cap():
+    limiter = RateLimiter(rate_per_minute=60)
+    limiter.update({"X-RateLimit-Total": "5000", "X-RateLimit-Remaining": "4999"})
+    assert limiter.rate == 60
+    assert limiter.stats()["configured_per_minute"] == 60
+    assert limiter.stats()["limit_total"] == 5000
+    assert [limiter.reserve() for _ in range(6)] == [0] * 6
+    assert limiter.reserve() > 0.9
+
+
+def test_update_without_configured_cap():
+    limiter = RateLimiter()
+    assert limiter.rate == 0
+    limiter.update({"X-RateLimit-Total": "300"})
+    assert limiter.rate == 300
+    assert limiter.capacity == 30
@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+import FreshService.Records
+from FreshService.Records import RECORD_TYPES, InstallRecord, LicenseRecord, UserRecord, intern, software_from_dict, to_json
+
+# Items in the cache format the client wrote before records, including the None values of missing assets and licenses
+CACHED = {"installs": [{"path": "C:\\Program Files\\Editor", "version": "1.2", "user": 501, "name": "host-000001",
+                        "description": "Workstation 1  |  Floor 1 & desk 1", "status": "In Use", "machine": 100001},
+                       {"path": "C:\\Program Files\\Editor", "version": "1.2", "user": None, "name": None,
+                        "description": None, "status": None, "machine": 100002}],
+          "users": [{"user": 501, "license": None, "state": "active", "last_use": "2024-01-01T00:00:00Z"}],
+          "licenses": [{"license": 900, "contract_id": 50}]}
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = {}
+    monkeypatch.setattr(FreshService.Records, "_pool", pool)
+    return pool
+
+
+@pytest.mark.parametrize("field", list(RECORD_TYPES))
+def test_cache_dict_round_trip(field):
+    for item in CACHED[field]:
+        record = RECORD_TYPES[field].from_dict(item)
+        assert record.to_dict() == item
+        assert list(record.to_dict()) == list(item)
+        assert RECORD_TYPES[field].from_dict(record.to_dict()) == record
+
+
+def test_software_round_trip_through_json():
+    software = {"name": "Editor", "publisher_id": "1", "fetched_at": 1700000000, **json.loads(json.dumps(CACHED))}
+    cached = json.dumps(software, sort_keys=True)
+    software_from_dict(software)
+    assert [type(item) for item in software["installs"] + software["users"] + software["licenses"]] == [InstallRecord, InstallRecord, UserRecord, LicenseRecord]
+    assert json.dumps(software, default=to_json, sort_keys=True) == cached
+
+
+def test_dict_access():
+    record = UserRecord.from_dict(CACHED["users"][0])
+    assert (record["state"], record.get("license"), record.get("missing", "-")) == ("active", None, "-")
+    assert "state" in record and "missing" not in record
+    record.update({"state": "inactive"})
+    assert record.state == "inactive"
+    with pytest.raises(KeyError):
+        record["missing"] = 1
+    assert LicenseRecord(900, 50).keys() == ["license", "contract_id"]
+
+
+def test_interned_fields_share_strings(pool):
+    first, second = (InstallRecord.from_dict(json.loads(json.dumps(item))) for item in CACHED["installs"])
+    assert first.path is second.path
+    assert first.user == 501 and second.name is None
+
+
+def test_pool_is_bounded(pool, monkeypatch):
+    monkeypatch.setattr(FreshService.Records, "POOL_SIZE", 3)
+    kept = intern("-".join(["kept", "1"]))
+    for value in ("a", "b", "c", "d"):
+        intern(value)
+    assert len(pool) == 2
+    assert intern("-".join(["kept", "1"])) is not kept
+    assert intern(7) == 7
@@ -0,0 +1,166 @@
+import io
+import json
+
+import pytest
+
+VENDORS = {"1": {"name": "Acme"}, "2": {"name": "Globex"}, "3": {"name": "Initech"}}
+
+
+def install(version, user, machine, status, description=None):
+    return {"path": "C:\\Apps", "version": version, "user": user, "name": f"host-{machine}", "description": description, "status": status,
+            "machine": machine}
+
+
+SOFTWARE = {"10": {"name": "Editor", "publisher_id": "1", "category": "Productivity", "status": "managed",
+                   "installs": [install("1.0", 501, 1, "In Use", "Desk 1  |  Floor 2"), install("2.0", 503, 3, "In Use"), install("1.0", 502, 2, "Retired")],
+                   "users": [{"user": 501, "license": None, "state": "active", "last_use": "2024-01-01T00:00:00Z"},
+                             {"user": 502, "license": 900, "state": "inactive", "last_use": None}],
+                   "licenses": [{"license": 900, "contract_id": 50}]},
+            "11": {"name": "Agent", "publisher_id": "1", "category": "Security", "status": "managed", "installs": [], "users": [], "licenses": []},
+            "20": {"name": "Viewer", "publisher_id": "2", "category": "Productivity", "status": "ignored",
+                   "installs": [install("3.1", 504, 4, "Retired")], "users": [],
+                   "licenses": [{"license": 901, "contract_id": None}]}}
+
+MARKDOWN = ["## 1 - Acme\n",
+            "### 10 - Editor",
+            "- v1.0",
+            "\t- Installed: 501 @ host-1 [Device: In Use]  \n        Desk 1  |  Floor 2",
+            "- v2.0",
+            "\t- Installed: 503 @ host-3 [Device: In Use]",
+            "\t- User: 501 [State: active] w/None licenses - Last used: 2024-01-01T00:00:00Z",
+            "\t- User: 502 [State: inactive] w/900 licenses - Last used: N/A",
+            "\t- License: 900 50",
+            "",
+            "______\n",
+            "## 2 - Globex\n",
+            "\t- License: 901 None",
+            "",
+            "______\n"]
+
+CSV = ("vendor_id,vendor_name,software_id,software_name,record,version,user,machine,name,status,description,path,license,contract_id,state,last_use\r\n"
+       "1,Acme,10,Editor,install,1.0,501,1,host-1,In Use,Desk 1  |  Floor 2,C:\\Apps,,,,\r\n"
+       "1,Acme,10,Editor,install,2.0,503,3,host-3,In Use,,C:\\Apps,,,,\r\n"
+       "1,Acme,10,Editor,user,,501,,,,,,,,active,2024-01-01T00:00:00Z\r\n"
+       "1,Acme,10,Editor,user,,502,,,,,,900,,inactive,\r\n"
+       "1,Acme,10,Editor,license,,,,,,,,900,50,,\r\n"
+       "2,Globex,20,Viewer,license,,,,,,,,901,,,\r\n")
+
+JSONL = [{"vendor_id": "1", "vendor_name": "Acme", "software_id": "10", "software_name": "Editor",
+          "versions": {"1.0": [SOFTWARE["10"]["installs"][0]], "2.0": [SOFTWARE["10"]["installs"][1]]},
+          "users": SOFTWARE["10"]["users"], "licenses": SOFTWARE["10"]["licenses"]},
+         {"vendor_id": "2", "vendor_name": "Globex", "software_id": "20", "software_name": "Viewer",
+          "versions": {}, "users": [], "licenses": SOFTWARE["20"]["licenses"]}]
+
+
+def legacy_list_software(client, vendor_id_list=[], software_id_list=[]):
+    # The Markdown list_software built before the report writers, without its printing. It walked versions in set order,
+    # first-seen order is the one order of those it could produce on every run
+    string_builder = []
+    if software_id_list and not vendor_id_list:
+        for software_id in software_id_list:
+            pid = client.SoftwareRegister[software_id]['publisher_id']
+            pname = client.VendorRegister[pid]['name']
+            string_builder.append(f"- {pid} - {pname} - {software_id} - {client.SoftwareRegister[software_id]['name']}")
+        return string_builder
+    for vendor_id in vendor_id_list or list(client.VendorRegister):
+        temp_string_builder = []
+        vendor = client.VendorRegister[vendor_id]
+        if not vendor['software'] and not client.settings.VERBOSE:
+            continue
+        temp_string_builder.append(f"## {vendor_id} - {vendor['name']}\n")
+        for software_id in vendor['software']:
+            if software_id_list and software_id not in software_id_list:
+                continue
+            software = client.SoftwareRegister[software_id]
+            if not client.settings.VERBOSE and not software["users"] and not software["installs"] and not software["licenses"]:
+                continue
+            content_0 = False
+            for version in dict.fromkeys(install["version"] for install in software["installs"]):
+                content_1 = False
+                for install in software["installs"]:
+                    if install["version"] != version:
+                        continue
+                    if not client.settings.VERBOSE and install["status"] != "In Use":
+                        continue
+                    if not content_0:
+                        content_0 = True
+                        temp_string_builder.append(f"### {software_id} - {software['name']}")
+                    if not content_1:
+                        content_1 = True
+                        temp_string_builder.append(f"- v{version}")
+                    if install['description']:
+                        temp_string_builder.append(f"\t- Installed: {install['user']} @ {install['name']} [Device: {install['status']}]  \n"
+                                                   f"        {install['description']}")
+                    else:
+                        temp_string_builder.append(f"\t- Installed: {install['user']} @ {install['name']} [Device: {install['status']}]")
+            for user in software["users"]:
+                temp_string_builder.append(f"\t- User: {user['user']} [State: {user['state']}] w/{user['license']} licenses - Last used: "
+                                           f"{'N/A' if not user['last_use'] else user['last_use']}")
+            for license in software["licenses"]:
+                temp_string_builder.append(f"\t- License: {license['license']} {license['contract_id']}")
+        if len(temp_string_builder) == 1:
+            continue
+        temp_string_builder.append("")
+        temp_string_builder.append("______\n")
+        string_builder.extend(temp_string_builder)
+    return string_builder
+
+
+@pytest.fixture
+def cached(tmp_path):
+    (tmp_path / "vendors.json").write_text(json.dumps(VENDORS))
+    (tmp_path / "software.json").write_text(json.dumps(SOFTWARE))
+
+
+def report(client, report_format, **kwargs):
+    sink = io.StringIO(newline="")
+    records = client.write_report(sink, report_format=report_format, **kwargs)
+    return sink.getvalue(), records
+
+
+def test_markdown(make_client, cached):
+    with make_client() as client:
+        assert report(client, "markdown") == ("\n".join(MARKDOWN), len(MARKDOWN))
+
+
+def test_markdown_summary(make_client, cached):
+    with make_client() as client:
+        assert report(client, "markdown", software_id_list=["20", "10"]) == ("- 2 - Globex - 20 - Viewer\n- 1 - Acme - 10 - Editor", 2)
+
+
+def test_csv(make_client, cached):
+    with make_client() as client:
+        assert report(client, "csv") == (CSV, 6)
+
+
+def test_jsonl(make_client, cached):
+    with make_client() as client:
+        output, records = report(client, "jsonl")
+    assert output.endswith("\n")
+    assert [json.loads(line) for line in output.splitlines()] == JSONL
+    assert records == 2
+
+
+def test_unknown_format(make_client, cached):
+    with make_client() as client, pytest.raises(ValueError):
+        report(client, "xml")
+
+
+def test_list_software_returns_the_markdown_lines(make_client, cached, tmp_path):
+    with make_client() as client:
+        assert client.list_software(write=True, output_path=str(tmp_path / "message.md")) == MARKDOWN
+        assert client.list_software(vendor_id_list=["2"]) == MARKDOWN[-4:]
+    assert (tmp_path / "message.md").read_text() == "\n".join(MARKDOWN)
+
+
+@pytest.mark.parametrize("verbose", [False, True])
+def test_list_software_matches_legacy_output(make_client, verbose):
+    with make_client(VERBOSE=verbose) as client:
+        client.get_vendors(update_cache=True)
+        client.get_software(update_cache=True)
+        client.expand_software()
+        software_ids = list(client.SoftwareRegister)[::5]
+        assert client.list_software() == legacy_list_software(client)
+        assert client.list_software(software_id_list=software_ids) == legacy_list_software(client, software_id_list=software_ids)
+        assert client.list_software(vendor_id_list=["2"], software_id_list=software_ids) == \
+            legacy_list_software(client, vendor_id_list=["2"], software_id_list=software_ids)
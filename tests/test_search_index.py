@@ -0,0 +1,63 @@
+import pytest
+
+from FreshService.SearchIndex import SearchIndex
+
+
+@pytest.fixture
+def index():
+    index = SearchIndex()
+    index.add("1", "Visual Studio Code", publisher_id="10", category="Development")
+    index.add("2", "Microsoft Visual Studio", publisher_id="10", category="Development")
+    index.add("3", "Adobe Acrobat Reader", publisher_id="20", category="Productivity")
+    index.add("4", "7-Zip", publisher_id=None, category="Productivity")
+    return index
+
+
+def test_substring(index):
+    assert index.substring("studio") == {"1", "2"}
+    assert index.substring("READER") == {"3"}
+    assert index.substring("zip") == {"4"}
+    assert index.substring("missing") == set()
+
+
+def test_substring_shorter_than_ngram(index):
+    assert index.substring("7") == {"4"}
+    assert index.substring("") == {"1", "2", "3", "4"}
+
+
+def test_prefix(index):
+    assert index.prefix("visual") == {"1"}
+    assert index.prefix("Micro") == {"2"}
+    assert index.prefix("studio") == set()
+
+
+def test_attributes(index):
+    assert index.lookup("publisher_id", "10") == {"1", "2"}
+    assert index.lookup("publisher_id", None) == {"4"}
+    assert index.lookup("category", "productivity") == {"3", "4"}
+    assert index.lookup("unknown", "10") == set()
+
+
+def test_search(index):
+    assert index.search(["visual", "adobe"]) == ["1", "2", "3"]
+    assert index.search(["visual", "microsoft"], match_all=True) == ["2"]
+    assert index.search(["visual"], prefix=True) == ["1"]
+    assert index.search(["studio"], category="Development", publisher_id="10") == ["1", "2"]
+    assert index.search(category="Productivity") == ["3", "4"]
+    assert index.search() == ["1", "2", "3", "4"]
+
+
+def test_update_keeps_order(index):
+    index.add("1", "Code", publisher_id="30", category="Development")
+    assert index.substring("visual") == {"2"}
+    assert index.lookup("publisher_id", "10") == {"2"}
+    assert index.search(category="Development") == ["1", "2"]
+
+
+def test_remove(index):
+    index.remove("3")
+    index.remove("3")
+    assert "3" not in index
+    assert len(index) == 3
+    assert index.substring("reader") == set()
+    assert index.lookup("publisher_id", "20") == set()
@@ -0,0 +1,101 @@
+from FreshService.Records import InstallRecord, LicenseRecord, UserRecord, software_from_dict
+
+
+def make_software(name, publisher_id, installs=1):
+    return {"name": name, "publisher_id": publisher_id, "category": "Security", "status": "managed", "updated_at": "2024-01-01T00:00:00Z",
+            "fetched_at": 1700000000,
+            "installs": [InstallRecord(f"C:\\{name}", "1.0", 500 + i, f"host-{i}", "Workstation", "In Use", 100000 + i) for i in range(installs)],
+            "users": [UserRecord(500, None, "active", "2024-01-01T00:00:00Z")],
+            "licenses": [LicenseRecord(900, 50)]}
+
+
+def make_register():
+    return {"10": make_software("Editor", "1", installs=2),
+            "11": make_software("Agent", "1"),
+            "20": make_software("Viewer", "2", installs=3)}
+
+
+def load(backend, vendor_id_list=None):
+    register = backend.load_software(vendor_id_list)
+    for software in register.values():
+        software_from_dict(software)
+    return register
+
+
+def test_save_and_load(backend):
+    register = make_register()
+    assert not backend.has_software()
+    backend.save_software(register)
+    assert backend.has_software()
+    assert load(backend) == register
+
+
+def test_save_replaces_cache(backend):
+    backend.save_software(make_register())
+    register = {"20": make_software("Viewer", "2")}
+    backend.save_software(register)
+    assert load(backend) == register
+
+
+def test_upsert(backend):
+    register = make_register()
+    backend.save_software(register)
+    register["11"]["installs"] = []
+    register["12"] = make_software("Runtime", "1", installs=4)
+    backend.upsert_software(register, ["11", "12"])
+    backend.flush(register)
+    assert load(backend) == register
+
+
+def test_delete(backend):
+    register = make_register()
+    backend.save_software(register)
+    register.pop("10")
+    backend.delete_software(register, ["10"])
+    backend.flush(register)
+    assert load(backend) == register
+
+
+def test_delete_last_application_of_vendor(backend):
+    register = make_register()
+    backend.save_software(register)
+    register.pop("20")
+    backend.delete_software(register, ["20"])
+    backend.flush(register)
+    assert load(backend) == register
+
+
+def test_partial_load(backend):
+    register = make_register()
+    backend.save_software(register)
+    loaded = load(backend, ["2"])
+    if backend.partial_reads:
+        assert loaded == {"20": register["20"]}
+    else:
+        assert loaded == register
+
+
+def test_partial_load_of_vendor_without_applications(backend):
+    backend.save_software(make_register())
+    loaded = load(backend, ["3"])
+    assert backend.has_software()
+    if backend.partial_reads:
+        assert loaded == {}
+
+
+def test_partial_register_upsert_keeps_other_vendors(backend):
+    register = make_register()
+    backend.save_software(register)
+    partial = load(backend, ["1"]) if backend.partial_reads else load(backend)
+    partial["10"]["status"] = "ignored"
+    backend.upsert_software(partial, ["10"])
+    backend.flush(partial)
+    register["10"]["status"] = "ignored"
+    assert load(backend) == register
+
+
+def test_vendors(backend):
+    vendors = {"1": {"name": "Vendor 1", "software": [], "updated_at": "2024-01-01T00:00:00Z", "fetched_at": 1700000000},
+               "UNREGISTERED": {"name": "UNREGISTERED", "software": []}}
+    backend.save_vendors(vendors)
+    assert backend.load_vendors() == vendors
@@ -0,0 +1,77 @@
+import json
+
+import pytest
+
+from FreshService.Templates import TicketTemplates
+
+TEMPLATES = {"DEFAULT": {"email": "", "subject": "File subject", "priority": 1, "urgency": 1, "cc_emails": ["soc@example.com"], "category": ""},
+             "CTI": {"subject": "Cyber Threat Intelligence", "urgency": 2, "category": "CyberSecurity", "tags": ["intel"]}}
+
+
+@pytest.fixture
+def templates(tmp_path):
+    (tmp_path / "templates.json").write_text(json.dumps(TEMPLATES))
+
+
+@pytest.fixture
+def ticket_client(make_client, templates):
+    def ticket_client():
+        return make_client(FRESH_WORKSPACE_ID=2, FRESH_DEFAULT_CATEGORY="Settings category", FRESH_DEFAULT_SUBJECT="Settings subject")
+    return ticket_client
+
+
+def test_merge_order():
+    templates = TicketTemplates(TEMPLATES, {"email": "contact@example.com", "category": "Settings category", "subject": "Settings subject"})
+    # The settings override the DEFAULT of the file, a named template overrides both
+    assert dict(templates["DEFAULT"]) == {**TEMPLATES["DEFAULT"], "email": "contact@example.com", "category": "Settings category",
+                                          "subject": "Settings subject", "cc_emails": ("soc@example.com",)}
+    ticket = templates.render("CTI", "<p>body</p>")
+    assert ticket == {"email": "contact@example.com", "subject": "Cyber Threat Intelligence", "priority": 1, "urgency": 2,
+                      "cc_emails": ["soc@example.com"], "category": "CyberSecurity", "tags": ["intel"], "description": "<p>body</p>"}
+    assert templates.render("CTI", "<p>body</p>", subject="  Explicit  ")["subject"] == "Explicit"
+
+
+def test_rendered_tickets_do_not_share_state():
+    templates = TicketTemplates(TEMPLATES)
+    first = templates.render("CTI", "first")
+    first["cc_emails"].append("extra@example.com")
+    first["tags"].clear()
+    second = templates.render("CTI", "second")
+    assert (second["cc_emails"], second["tags"]) == (["soc@example.com"], ["intel"])
+    assert TEMPLATES["CTI"]["tags"] == ["intel"]
+
+
+def test_generate_tickets_keeps_cc_emails(ticket_client, server):
+    with ticket_client() as client:
+        results = client.generate_tickets([{"message": f"Finding {i}"} for i in range(5)])
+    assert sorted(result["id"] for result in results) == [1, 2, 3, 4, 5]
+    assert [ticket["cc_emails"] for ticket in server.tickets] == [["soc@example.com", "test@example.com"]] * 5
+
+
+def test_generate_tickets_merges_template_over_defaults(ticket_client, server, tmp_path):
+    message = tmp_path / "message.md"
+    message.write_text("**Indicator** seen\n")
+    with ticket_client() as client:
+        results = client.generate_tickets([{"message": str(message), "template_name": "CTI"},
+                                           {"message": "Default ticket"},
+                                           {"message": "Explicit subject", "subject": "Phishing wave", "template_name": "CTI"}])
+    assert [result["subject"] for result in results] == ["Cyber Threat Intelligence", "Settings subject", "Phishing wave"]
+    assert [result["error"] for result in results] == [None] * 3
+    tickets = {ticket["subject"]: ticket for ticket in server.tickets}
+    assert tickets["Cyber Threat Intelligence"] == {"email": "test@example.com", "subject": "Cyber Threat Intelligence", "priority": 1, "urgency": 2,
+                                                    "cc_emails": ["soc@example.com", "test@example.com"], "category": "CyberSecurity", "tags": ["intel"],
+                                                    "workspace_id": 2, "department_id": 0, "group_id": 0,
+                                                    "description": "<p><strong>Indicator</strong> seen</p>"}
+    assert (tickets["Settings subject"]["category"], tickets["Settings subject"]["urgency"]) == ("Settings category", 1)
+    assert tickets["Phishing wave"]["category"] == "CyberSecurity"
+
+
+def test_generate_tickets_reports_errors_per_ticket(ticket_client, server):
+    with ticket_client() as client:
+        results = client.generate_tickets([{"message": "Unknown", "subject": "Lost", "template_name": "MISSING"},
+                                           {"message": "  \n ", "subject": "Empty"},
+                                           {"message": "Valid", "subject": "Kept"}])
+    assert results[0] == {"id": None, "subject": "Lost", "error": "Template not found: 'MISSING'"}
+    assert results[1] == {"id": None, "subject": "Empty", "error": "Missing ticket content: description"}
+    assert results[2] == {"id": 1, "subject": "Kept", "error": None}
+    assert [ticket["subject"] for ticket in server.tickets] == ["Kept"]